@@ -21,6 +21,21 @@ from ._l_diversity import l_diversity, entropy_l_diversity, recursive_c_l_divers
 from ._t_closeness import t_closeness
 from ._beta_likeness import basic_beta_likeness, enhanced_beta_likeness
 from ._delta_disclosure import delta_disclosure
+from ._lattice import lattice_search, optimal_k_anonymity
+from ._result import AnonymizationResult
+from ._models import (
+    anonymize,
+    PrivacyModel,
+    KAnonymity,
+    AlphaAnonymity,
+    LDiversity,
+    EntropyLDiversity,
+    RecursiveCLDiversity,
+    TCloseness,
+    BasicBetaLikeness,
+    EnhancedBetaLikeness,
+    DeltaDisclosure,
+)
 
 __all__ = [
     "k_anonymity",
@@ -33,4 +48,18 @@ __all__ = [
     "basic_beta_likeness",
     "enhanced_beta_likeness",
     "delta_disclosure",
+    "lattice_search",
+    "optimal_k_anonymity",
+    "AnonymizationResult",
+    "anonymize",
+    "PrivacyModel",
+    "KAnonymity",
+    "AlphaAnonymity",
+    "LDiversity",
+    "EntropyLDiversity",
+    "RecursiveCLDiversity",
+    "TCloseness",
+    "BasicBetaLikeness",
+    "EnhancedBetaLikeness",
+    "DeltaDisclosure",
 ]
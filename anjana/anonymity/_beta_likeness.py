@@ -14,19 +14,27 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
 import numpy as np
 import pandas as pd
-import pycanon
-from anjana.anonymity.utils import utils
-from copy import copy
-from anjana.anonymity import k_anonymity_inner
+from anjana.anonymity.utils.encoding import EncodedData
+from anjana.anonymity._k_anonymity import _k_anonymity_table
+from anjana.anonymity._models import (
+    BasicBetaLikeness,
+    EnhancedBetaLikeness,
+    KAnonymity,
+    _achieved,
+    _apply_models,
+)
+from anjana.anonymity._result import AnonymizationResult, _output
 from beartype import beartype
 from beartype import typing
 
 
 @beartype()
 def basic_beta_likeness(
-    data: pd.DataFrame,
+    data: typing.Union[pd.DataFrame, EncodedData],
     ident: typing.Union[typing.List, np.ndarray],
     quasi_ident: typing.Union[typing.List, np.ndarray],
     sens_att: str,
@@ -34,11 +42,12 @@ def basic_beta_likeness(
     beta: typing.Union[float, int],
     supp_level: typing.Union[float, int],
     hierarchies: dict,
-) -> pd.DataFrame:
+    return_result: bool = False,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
     """Anonymize a dataset using basic beta-likeness and k-anonymity.
 
     :param data: data under study.
-    :type data: pandas dataframe
+    :type data: pandas dataframe or EncodedData
 
     :param ident: list with the name of the columns of the dataframe
         that are identifiers.
@@ -65,56 +74,30 @@ def basic_beta_likeness(
     :type hierarchies: dictionary containing one dictionary for QI
         with the hierarchies and the levels
 
-    :return: anonymized data.
-    :rtype: pandas dataframe
-    """
-    if beta < 0:
-        raise ValueError(f"Invalid value of beta for beta-likeness, beta={beta}")
+    :param return_result: whether to return the anonymized data along with
+        the transformation applied, the records suppressed and the values of
+        k and beta achieved.
+    :type return_result: bool
 
-    data_kanon, supp_records, gen_level = k_anonymity_inner(
-        data, ident, quasi_ident, k, supp_level, hierarchies
-    )
+    :return: anonymized data, or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
+    """
+    model = BasicBetaLikeness(beta)
 
-    beta_real = pycanon.anonymity.basic_beta_likeness(
-        data_kanon, quasi_ident, [sens_att]
+    start = time.perf_counter()
+    table, verified = _k_anonymity_table(
+        data, ident, quasi_ident, k, supp_level, hierarchies, sens_att
     )
-    quasi_ident_gen = copy(quasi_ident)
-
-    if beta_real <= beta:
-        print(f"The data verifies basic beta-likeness with beta={beta_real}")
-        return data_kanon
-
-    while beta_real > beta:
-        if len(quasi_ident_gen) == 0:
-            print(f"Basic beta likeness cannot be achieved for beta={beta}")
-            return pd.DataFrame()
+    if verified:
+        table, verified = _apply_models(table, [model], supp_level)
 
-        qi_gen = quasi_ident_gen[
-            np.argmax([len(np.unique(data_kanon[qi])) for qi in quasi_ident_gen])
-        ]
-
-        try:
-            generalization_qi = utils.apply_hierarchy(
-                data_kanon[qi_gen].values, hierarchies[qi_gen], gen_level[qi_gen] + 1
-            )
-            data_kanon[qi_gen] = generalization_qi
-            gen_level[qi_gen] = gen_level[qi_gen] + 1
-        except ValueError:
-            if qi_gen in quasi_ident_gen:
-                quasi_ident_gen.remove(qi_gen)
-
-        beta_real = pycanon.anonymity.basic_beta_likeness(
-            data_kanon, quasi_ident, [sens_att]
-        )
-        if beta_real <= beta:
-            return data_kanon
-
-    return data_kanon
+    achieved = _achieved([KAnonymity(k), model])
+    return _output(table, verified, start, achieved, return_result)
 
 
 @beartype()
 def enhanced_beta_likeness(
-    data: pd.DataFrame,
+    data: typing.Union[pd.DataFrame, EncodedData],
     ident: typing.Union[typing.List, np.ndarray],
     quasi_ident: typing.Union[typing.List, np.ndarray],
     sens_att: str,
@@ -122,11 +105,12 @@ def enhanced_beta_likeness(
     beta: typing.Union[float, int],
     supp_level: typing.Union[float, int],
     hierarchies: dict,
-) -> pd.DataFrame:
+    return_result: bool = False,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
     """Anonymize a dataset using enhanced beta-likeness and k-anonymity.
 
     :param data: data under study.
-    :type data: pandas dataframe
+    :type data: pandas dataframe or EncodedData
 
     :param ident: list with the name of the columns of the dataframe
         that are identifiers.
@@ -153,48 +137,22 @@ def enhanced_beta_likeness(
     :type hierarchies: dictionary containing one dictionary for QI
         with the hierarchies and the levels
 
-    :return: anonymized data.
-    :rtype: pandas dataframe
+    :param return_result: whether to return the anonymized data along with
+        the transformation applied, the records suppressed and the values of
+        k and beta achieved.
+    :type return_result: bool
+
+    :return: anonymized data, or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
     """
-    if beta < 0:
-        raise ValueError(f"Invalid value of beta for beta-likeness, beta={beta}")
+    model = EnhancedBetaLikeness(beta)
 
-    data_kanon, supp_records, gen_level = k_anonymity_inner(
-        data, ident, quasi_ident, k, supp_level, hierarchies
+    start = time.perf_counter()
+    table, verified = _k_anonymity_table(
+        data, ident, quasi_ident, k, supp_level, hierarchies, sens_att
     )
+    if verified:
+        table, verified = _apply_models(table, [model], supp_level)
 
-    beta_real = pycanon.anonymity.enhanced_beta_likeness(
-        data_kanon, quasi_ident, [sens_att]
-    )
-    quasi_ident_gen = copy(quasi_ident)
-
-    if beta_real <= beta:
-        print(f"The data verifies enhanced beta-likeness with beta={beta_real}")
-        return data_kanon
-
-    while beta_real > beta:
-        if len(quasi_ident_gen) == 0:
-            print(f"Enhanced beta likeness cannot be achieved for beta={beta}")
-            return pd.DataFrame()
-
-        qi_gen = quasi_ident_gen[
-            np.argmax([len(np.unique(data_kanon[qi])) for qi in quasi_ident_gen])
-        ]
-
-        try:
-            generalization_qi = utils.apply_hierarchy(
-                data_kanon[qi_gen].values, hierarchies[qi_gen], gen_level[qi_gen] + 1
-            )
-            data_kanon[qi_gen] = generalization_qi
-            gen_level[qi_gen] = gen_level[qi_gen] + 1
-        except ValueError:
-            if qi_gen in quasi_ident_gen:
-                quasi_ident_gen.remove(qi_gen)
-
-        beta_real = pycanon.anonymity.enhanced_beta_likeness(
-            data_kanon, quasi_ident, [sens_att]
-        )
-        if beta_real <= beta:
-            return data_kanon
-
-    return data_kanon
+    achieved = _achieved([KAnonymity(k), model])
+    return _output(table, verified, start, achieved, return_result)
@@ -14,19 +14,26 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
 import numpy as np
 import pandas as pd
-import pycanon
-from anjana.anonymity.utils import utils
-from copy import copy
-from anjana.anonymity import k_anonymity_inner
+from anjana.anonymity.utils.encoding import EncodedData
+from anjana.anonymity._k_anonymity import _k_anonymity_table
+from anjana.anonymity._models import (
+    DeltaDisclosure,
+    KAnonymity,
+    _achieved,
+    _apply_models,
+)
+from anjana.anonymity._result import AnonymizationResult, _output
 from beartype import beartype
 from beartype import typing
 
 
 @beartype()
 def delta_disclosure(
-    data: pd.DataFrame,
+    data: typing.Union[pd.DataFrame, EncodedData],
     ident: typing.Union[typing.List, np.ndarray],
     quasi_ident: typing.Union[typing.List, np.ndarray],
     sens_att: str,
@@ -34,11 +41,12 @@ def delta_disclosure(
     delta: typing.Union[float, int],
     supp_level: typing.Union[float, int],
     hierarchies: dict,
-) -> pd.DataFrame:
+    return_result: bool = False,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
     """Anonymize a dataset using delta-disclosure privacy and k-anonymity.
 
     :param data: data under study.
-    :type data: pandas dataframe
+    :type data: pandas dataframe or EncodedData
 
     :param ident: list with the name of the columns of the dataframe
         that are identifiers.
@@ -65,46 +73,22 @@ def delta_disclosure(
     :type hierarchies: dictionary containing one dictionary for QI
         with the hierarchies and the levels
 
-    :return: anonymized data.
-    :rtype: pandas dataframe
+    :param return_result: whether to return the anonymized data along with
+        the transformation applied, the records suppressed and the values of
+        k and delta achieved.
+    :type return_result: bool
+
+    :return: anonymized data, or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
     """
-    if delta < 0:
-        raise ValueError(f"Invalid value of delta for delta-disclosure, delta={delta}")
+    model = DeltaDisclosure(delta)
 
-    data_kanon, supp_records, gen_level = k_anonymity_inner(
-        data, ident, quasi_ident, k, supp_level, hierarchies
+    start = time.perf_counter()
+    table, verified = _k_anonymity_table(
+        data, ident, quasi_ident, k, supp_level, hierarchies, sens_att
     )
+    if verified:
+        table, verified = _apply_models(table, [model], supp_level)
 
-    delta_real = pycanon.anonymity.delta_disclosure(data_kanon, quasi_ident, [sens_att])
-    quasi_ident_gen = copy(quasi_ident)
-
-    if delta_real <= delta:
-        print(f"The data verifies delta-disclosure with delta={delta_real}")
-        return data_kanon
-
-    while delta_real > delta:
-        if len(quasi_ident_gen) == 0:
-            print(f"Delta-disclosure privacy cannot be achieved for delta={delta}")
-            return pd.DataFrame()
-
-        qi_gen = quasi_ident_gen[
-            np.argmax([len(np.unique(data_kanon[qi])) for qi in quasi_ident_gen])
-        ]
-
-        try:
-            generalization_qi = utils.apply_hierarchy(
-                data_kanon[qi_gen].values, hierarchies[qi_gen], gen_level[qi_gen] + 1
-            )
-            data_kanon[qi_gen] = generalization_qi
-            gen_level[qi_gen] = gen_level[qi_gen] + 1
-        except ValueError:
-            if qi_gen in quasi_ident_gen:
-                quasi_ident_gen.remove(qi_gen)
-
-        delta_real = pycanon.anonymity.delta_disclosure(
-            data_kanon, quasi_ident, [sens_att]
-        )
-        if delta_real <= delta:
-            return data_kanon
-
-    return data_kanon
+    achieved = _achieved([KAnonymity(k), model])
+    return _output(table, verified, start, achieved, return_result)
@@ -14,19 +14,28 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
 import numpy as np
 import pandas as pd
-import pycanon
-from anjana.anonymity.utils import utils
-from copy import copy
-from anjana.anonymity import k_anonymity_inner
+from anjana.anonymity.utils.encoding import EncodedData, EncodedTable
+from anjana.anonymity._k_anonymity import _k_anonymity_table
+from anjana.anonymity._models import (
+    EntropyLDiversity,
+    KAnonymity,
+    LDiversity,
+    RecursiveCLDiversity,
+    _achieved,
+    _apply_models,
+)
+from anjana.anonymity._result import AnonymizationResult, _output
 from beartype import beartype
 from beartype import typing
 
 
 @beartype()
 def l_diversity(
-    data: pd.DataFrame,
+    data: typing.Union[pd.DataFrame, EncodedData],
     ident: typing.Union[typing.List, np.ndarray],
     quasi_ident: typing.Union[typing.List, np.ndarray],
     sens_att: str,
@@ -34,11 +43,12 @@ def l_diversity(
     l_div: int,
     supp_level: typing.Union[float, int],
     hierarchies: dict,
-) -> pd.DataFrame:
+    return_result: bool = False,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
     """Anonymize a dataset using l-diversity.
 
     :param data: data under study.
-    :type data: pandas dataframe
+    :type data: pandas dataframe or EncodedData
 
     :param ident: list with the name of the columns of the dataframe
         that are identifiers.
@@ -65,18 +75,25 @@ def l_diversity(
     :type hierarchies: dictionary containing one dictionary for QI
         with the hierarchies and the levels
 
-    :return: anonymized data.
-    :rtype: pandas dataframe
+    :param return_result: whether to return the anonymized data along with
+        the transformation applied, the records suppressed and the values of
+        k and l achieved.
+    :type return_result: bool
+
+    :return: anonymized data, or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
     """
-    data_anon, _ = _l_diversity_inner(
+    start = time.perf_counter()
+    table, verified = _l_diversity_table(
         data, ident, quasi_ident, sens_att, k, l_div, supp_level, hierarchies
     )
-    return data_anon
+    achieved = _achieved([KAnonymity(k), LDiversity(l_div)])
+    return _output(table, verified, start, achieved, return_result)
 
 
 @beartype()
 def entropy_l_diversity(
-    data: pd.DataFrame,
+    data: typing.Union[pd.DataFrame, EncodedData],
     ident: typing.Union[typing.List, np.ndarray],
     quasi_ident: typing.Union[typing.List, np.ndarray],
     sens_att: str,
@@ -84,11 +101,12 @@ def entropy_l_diversity(
     l_div: int,
     supp_level: typing.Union[float, int],
     hierarchies: dict,
-) -> pd.DataFrame:
+    return_result: bool = False,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
     """Anonymize a dataset using entropy l-diversity.
 
     :param data: data under study.
-    :type data: pandas dataframe
+    :type data: pandas dataframe or EncodedData
 
     :param ident: list with the name of the columns of the dataframe
         that are identifiers.
@@ -115,52 +133,30 @@ def entropy_l_diversity(
     :type hierarchies: dictionary containing one dictionary for QI
         with the hierarchies and the levels
 
-    :return: anonymized data.
-    :rtype: pandas dataframe
+    :param return_result: whether to return the anonymized data along with
+        the transformation applied, the records suppressed and the values of
+        k, l and entropy l achieved.
+    :type return_result: bool
+
+    :return: anonymized data, or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
     """
-    data_kanon = l_diversity(
+    model = EntropyLDiversity(l_div)
+
+    start = time.perf_counter()
+    table, verified = _l_diversity_table(
         data, ident, quasi_ident, sens_att, k, l_div, supp_level, hierarchies
     )
+    if verified:
+        table, verified = _apply_models(table, [model], supp_level)
 
-    l_real = pycanon.anonymity.entropy_l_diversity(data_kanon, quasi_ident, [sens_att])
-    quasi_ident_gen = copy(quasi_ident)
-    gen_level = utils.check_gen_level(data_kanon, quasi_ident, hierarchies)
-
-    if l_real >= l_div:
-        print(f"The data verifies entropy l-diversity with l={l_real}")
-        return data_kanon
-
-    while l_real < l_div:
-        if len(quasi_ident_gen) == 0:
-            print(f"Entropy l-diversity cannot be achieved for l={l_div}")
-            return pd.DataFrame()
-
-        qi_gen = quasi_ident_gen[
-            np.argmax([len(np.unique(data_kanon[qi])) for qi in quasi_ident_gen])
-        ]
-
-        try:
-            generalization_qi = utils.apply_hierarchy(
-                data_kanon[qi_gen].values, hierarchies[qi_gen], gen_level[qi_gen] + 1
-            )
-            data_kanon[qi_gen] = generalization_qi
-            gen_level[qi_gen] = gen_level[qi_gen] + 1
-        except ValueError:
-            if qi_gen in quasi_ident_gen:
-                quasi_ident_gen.remove(qi_gen)
-
-        l_real = pycanon.anonymity.entropy_l_diversity(
-            data_kanon, quasi_ident, [sens_att]
-        )
-        if l_real >= l_div:
-            return data_kanon
-
-    return data_kanon
+    achieved = _achieved([KAnonymity(k), LDiversity(l_div), model])
+    return _output(table, verified, start, achieved, return_result)
 
 
 @beartype()
 def recursive_c_l_diversity(
-    data: pd.DataFrame,
+    data: typing.Union[pd.DataFrame, EncodedData],
     ident: typing.Union[typing.List, np.ndarray],
     quasi_ident: typing.Union[typing.List, np.ndarray],
     sens_att: str,
@@ -169,11 +165,12 @@ def recursive_c_l_diversity(
     l_div: int,
     supp_level: typing.Union[float, int],
     hierarchies: dict,
-) -> pd.DataFrame:
+    return_result: bool = False,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
     """Anonymize a dataset using recursive (c,l)-diversity.
 
     :param data: data under study.
-    :type data: pandas dataframe
+    :type data: pandas dataframe or EncodedData
 
     :param ident: list with the name of the columns of the dataframe
         that are identifiers.
@@ -203,97 +200,29 @@ def recursive_c_l_diversity(
     :type hierarchies: dictionary containing one dictionary for QI
         with the hierarchies and the levels
 
-    :return: anonymized data.
-    :rtype: pandas dataframe
+    :param return_result: whether to return the anonymized data along with
+        the transformation applied, the records suppressed and the values of
+        k, l and c achieved.
+    :type return_result: bool
+
+    :return: anonymized data, or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
     """
-    if c < 1:
-        raise ValueError(f"Invalid value of c for recursive (c,l)-diversity, c={c}")
+    model = RecursiveCLDiversity(c, l_div)
 
-    data = copy(data)
-    data_kanon, supp_records = _l_diversity_inner(
+    start = time.perf_counter()
+    table, verified = _l_diversity_table(
         data, ident, quasi_ident, sens_att, k, l_div, supp_level, hierarchies
     )
+    if verified:
+        table, verified = _apply_models(table, [model], supp_level)
 
-    c_real, l_real = pycanon.anonymity.recursive_c_l_diversity(
-        data_kanon, quasi_ident, [sens_att]
-    )
-    quasi_ident_gen = copy(quasi_ident)
-    gen_level = utils.check_gen_level(data_kanon, quasi_ident, hierarchies)
-
-    if l_real >= l_div and c_real >= c:
-        print(
-            f"The data verifies recursive (c,l)-diversity with l={l_real}, c={c_real}"
-        )
-        return data_kanon
-
-    while l_real < l_div or c_real < c:
-        if len(quasi_ident_gen) == 0:
-            print(
-                f"Recursive (c,l)-diversity cannot be achieved for l={l_div} and c={c}"
-            )
-            return pd.DataFrame()
-
-        qi_gen = quasi_ident_gen[
-            np.argmax([len(np.unique(data_kanon[qi])) for qi in quasi_ident_gen])
-        ]
-
-        try:
-            generalization_qi = utils.apply_hierarchy(
-                data_kanon[qi_gen].values, hierarchies[qi_gen], gen_level[qi_gen] + 1
-            )
-            data_kanon[qi_gen] = generalization_qi
-            gen_level[qi_gen] = gen_level[qi_gen] + 1
-        except ValueError:
-            if qi_gen in quasi_ident_gen:
-                quasi_ident_gen.remove(qi_gen)
-
-        c_real, l_real = pycanon.anonymity.recursive_c_l_diversity(
-            data_kanon, quasi_ident, [sens_att]
-        )
-
-        equiv_class = pycanon.anonymity.utils.aux_anonymity.get_equiv_class(
-            data_kanon, quasi_ident
-        )
-        k_ec = []
-        c_ec = []
-        for ec in equiv_class:
-            data_temp = data_kanon.iloc[
-                pycanon.anonymity.utils.aux_functions.convert(ec)
-            ]
-            values = np.unique(data_temp[sens_att].values)
-            r_ec = np.sort([len(data_temp[data_temp[sens_att] == s]) for s in values])
-            c_ec.append(np.floor(r_ec[0] / sum(r_ec[(l_div - 1) :]) + 1))
-            k_ec.append(len(ec))
-            if max(c_ec) < c:
-                f"Recursive (c,l)-diversity cannot be achieved for l={l_div} and c={c}"
-            else:
-                data_ec = pd.DataFrame(
-                    {"equiv_class": equiv_class, "c_ec": c_ec, "k": k_ec}
-                )
-                data_ec_c = data_ec[data_ec.c_ec < c]
-                records_sup = sum(data_ec_c.k.values)
-                if (records_sup + supp_records) * 100 / len(data) <= supp_level:
-                    ec_elim = np.concatenate(
-                        [
-                            pycanon.anonymity.utils.aux_functions.convert(ec)
-                            for ec in data_ec_c.equiv_class.values
-                        ]
-                    )
-                    anonim_data = data_kanon.drop(ec_elim).reset_index()
-                    c_supp, l_supp = pycanon.anonymity.recursive_c_l_diversity(
-                        anonim_data, quasi_ident, [sens_att]
-                    )
-                    if l_supp >= l_div and c_supp > c:
-                        return anonim_data
-
-        if l_real >= l_div and c_real >= c:
-            return data_kanon
-
-    return data_kanon
-
-
-def _l_diversity_inner(
-    data: pd.DataFrame,
+    achieved = _achieved([KAnonymity(k), model])
+    return _output(table, verified, start, achieved, return_result)
+
+
+def _l_diversity_table(
+    data: typing.Union[pd.DataFrame, EncodedData],
     ident: typing.Union[typing.List, np.ndarray],
     quasi_ident: typing.Union[typing.List, np.ndarray],
     sens_att: str,
@@ -301,11 +230,11 @@ def _l_diversity_inner(
     l_div: int,
     supp_level: typing.Union[float, int],
     hierarchies: dict,
-) -> (pd.DataFrame, int):
-    """Anonymize a dataset using l-diversity.
+) -> typing.Tuple[EncodedTable, bool]:
+    """Apply l-diversity to the integer-coded data.
 
     :param data: data under study.
-    :type data: pandas dataframe
+    :type data: pandas dataframe or EncodedData
 
     :param ident: list with the name of the columns of the dataframe
         that are identifiers.
@@ -332,79 +261,15 @@ def _l_diversity_inner(
     :type hierarchies: dictionary containing one dictionary for QI
         with the hierarchies and the levels
 
-    :return: anonymized data.
-    :rtype: pandas dataframe
-
-    :return: number of records suppressed.
-    :rtype: int
+    :return: table with the generalization applied and the records
+        suppressed, and whether it verifies l-diversity.
+    :rtype: tuple
     """
-    if l_div < 1:
-        raise ValueError(f"Invalid value of l for l-diversity l={l_div}")
+    model = LDiversity(l_div)
 
-    data_kanon, supp_records_k, gen_level = k_anonymity_inner(
-        data, ident, quasi_ident, k, supp_level, hierarchies
+    table, verified = _k_anonymity_table(
+        data, ident, quasi_ident, k, supp_level, hierarchies, sens_att
     )
-
-    data = copy(data)
-    data = utils.suppress_identifiers(data, ident)
-
-    l_real = pycanon.anonymity.l_diversity(data_kanon, quasi_ident, [sens_att])
-    quasi_ident_gen = copy(quasi_ident)
-
-    if l_real >= l_div:
-        print(f"The data verifies l-diversity with l={l_real}")
-        return data_kanon, supp_records_k
-
-    while l_real < l_div:
-        equiv_class = pycanon.anonymity.utils.aux_anonymity.get_equiv_class(
-            data_kanon, quasi_ident
-        )
-        ec_sensitivity = [
-            len(np.unique(data_kanon.iloc[ec][sens_att])) for ec in equiv_class
-        ]
-        k_ec = [len(ec) for ec in equiv_class]
-
-        if l_div > max(ec_sensitivity):
-            data_ec = pd.DataFrame(
-                {"equiv_class": equiv_class, "l": ec_sensitivity, "k": k_ec}
-            )
-            data_ec_l = data_ec[data_ec.l < l_div]
-            records_sup = sum(data_ec_l.k.values)
-            if (records_sup + supp_records_k) * 100 / len(data) <= supp_level:
-                ec_elim = np.concatenate(
-                    [
-                        pycanon.anonymity.utils.aux_functions.convert(ec)
-                        for ec in data_ec_l.equiv_class.values
-                    ]
-                )
-                anonim_data = data_kanon.drop(ec_elim).reset_index()
-                l_supp = pycanon.anonymity.l_diversity(
-                    anonim_data, quasi_ident, [sens_att]
-                )
-                supp_records_l = supp_records_k + records_sup
-                if l_supp >= l_div:
-                    return anonim_data, supp_records_l
-
-        if len(quasi_ident_gen) == 0:
-            print(f"l-diversity cannot be achieved for l={l_div}")
-            return pd.DataFrame(), supp_records_k
-
-        qi_gen = quasi_ident_gen[
-            np.argmax([len(np.unique(data_kanon[qi])) for qi in quasi_ident_gen])
-        ]
-
-        try:
-            generalization_qi = utils.apply_hierarchy(
-                data_kanon[qi_gen].values, hierarchies[qi_gen], gen_level[qi_gen] + 1
-            )
-            data_kanon[qi_gen] = generalization_qi
-            gen_level[qi_gen] = gen_level[qi_gen] + 1
-        except ValueError:
-            if qi_gen in quasi_ident_gen:
-                quasi_ident_gen.remove(qi_gen)
-
-        l_real = pycanon.anonymity.l_diversity(data_kanon, quasi_ident, [sens_att])
-        if l_real >= l_div:
-            return data_kanon, supp_records_k
-
-    return data_kanon, supp_records_k
+    if not verified:
+        return table, False
+    return _apply_models(table, [model], supp_level)
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from anjana.anonymity.utils.encoding import EncodedData, encode_table
+from anjana.anonymity.utils.parallel import TransformationEvaluator
+from anjana.anonymity._models import KAnonymity, _achieved
+from anjana.anonymity._result import AnonymizationResult, _output
+from beartype import beartype
+from beartype import typing
+
+_MAX_LATTICE_SIZE = 50_000_000
+
+
+@beartype()
+def optimal_k_anonymity(
+    data: typing.Union[pd.DataFrame, EncodedData],
+    ident: typing.Union[typing.List, np.ndarray],
+    quasi_ident: typing.Union[typing.List, np.ndarray],
+    k: int,
+    supp_level: typing.Union[float, int],
+    hierarchies: dict,
+    loss: str = "precision",
+    n_jobs: typing.Optional[int] = 1,
+    return_result: bool = False,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
+    """Anonymize a dataset using k-anonymity with the optimal transformation.
+
+    The transformation applied is the one obtained with ``lattice_search``,
+    and the records of the equivalence classes with less than k records
+    are suppressed.
+
+    :param data: data under study.
+    :type data: pandas dataframe or EncodedData
+
+    :param ident: list with the name of the columns of the dataframe
+        that are identifiers.
+    :type ident: list of strings
+
+    :param quasi_ident: list with the name of the columns of the dataframe
+        that are quasi-identifiers.
+    :type quasi_ident: list of strings
+
+    :param k: desired level of k-anonymity.
+    :type k: int
+
+    :param supp_level: maximum level of record suppression allowed
+        (from 0 to 100).
+    :type supp_level: float
+
+    :param hierarchies: hierarchies for generalizing the QI.
+    :type hierarchies: dictionary containing one dictionary for QI
+        with the hierarchies and the levels
+
+    :param loss: loss metric to be minimized, "precision" or "discernibility".
+    :type loss: string
+
+    :param n_jobs: maximum number of processes computing the size of the
+        equivalence classes of the transformations (for checking k-anonymity)
+        in parallel, a single one being used for data with less than 100,000
+        equivalence classes. If None, the number of CPUs.
+    :type n_jobs: int
+
+    :param return_result: whether to return the anonymized data along with
+        the transformation applied, the records suppressed and the value of k
+        achieved.
+    :type return_result: bool
+
+    :return: anonymized data, or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
+    """
+    start = time.perf_counter()
+    table = encode_table(data, ident, quasi_ident, hierarchies)
+    transformation = lattice_search(
+        table.data,
+        quasi_ident,
+        k,
+        supp_level,
+        table.hierarchies,
+        loss=loss,
+        n_jobs=n_jobs,
+    )
+    verified = len(transformation) > 0
+    if verified:
+        for qi, level in zip(quasi_ident, transformation):
+            while qi in table.gen_level and table.gen_level[qi] < level:
+                table.generalize(qi)
+
+        classes = table.equiv_classes()
+        if min(classes.counts) < k:
+            table = table.suppress(classes.counts >= k)
+    return _output(table, verified, start, _achieved([KAnonymity(k)]), return_result)
+
+
+@beartype()
+def lattice_search(
+    data: typing.Union[pd.DataFrame, EncodedData],
+    quasi_ident: typing.Union[typing.List, np.ndarray],
+    k: int,
+    supp_level: typing.Union[float, int],
+    hierarchies: dict,
+    loss: str = "precision",
+    n_jobs: typing.Optional[int] = 1,
+) -> list:
+    """Search the optimal full-domain transformation for k-anonymity.
+
+    The lattice of transformations defined by the hierarchies is traversed
+    as in Flash: paths of untagged transformations are binary searched, and
+    each transformation checked tags all the more general ones (if it
+    verifies k-anonymity within the suppression level allowed) or all the
+    more specific ones (if it does not). With several jobs, as many
+    transformations of each path are checked at once by a pool of processes
+    sharing the equivalence classes of the data. The transformation returned
+    is the one with the minimum loss among all the transformations verifying
+    k-anonymity: since the records suppressed make the loss non-monotonic,
+    the verified transformations are visited from the lowest ones, skipping
+    those whose lower bound of the loss is not below the minimum found.
+
+    Example: a transformation [0,1,2,0] means:
+    - Level 0 of generalization for the 1st QI
+    - Level 1 of generalization for the 2nd QI
+    - Level 2 of generalization for the 3rd QI
+    - Level 0 of generalization for the 4th QI
+
+    :param data: data under study.
+    :type data: pandas dataframe or EncodedData
+
+    :param quasi_ident: list with the name of the columns of the dataframe
+        that are quasi-identifiers.
+    :type quasi_ident: list of strings
+
+    :param k: desired level of k-anonymity.
+    :type k: int
+
+    :param supp_level: maximum level of record suppression allowed
+        (from 0 to 100).
+    :type supp_level: float
+
+    :param hierarchies: hierarchies for generalizing the QI.
+    :type hierarchies: dictionary containing one dictionary for QI
+        with the hierarchies and the levels
+
+    :param loss: loss metric to be minimized, "precision" or "discernibility".
+    :type loss: string
+
+    :param n_jobs: maximum number of processes computing the size of the
+        equivalence classes of the transformations (for checking k-anonymity)
+        in parallel, a single one being used for data with less than 100,000
+        equivalence classes. If None, the number of CPUs.
+    :type n_jobs: int
+
+    :return: optimal transformation, or an empty list if k-anonymity cannot
+        be achieved.
+    :rtype: list
+    """
+    if k < 1:
+        raise ValueError(f"Invalid value of k for k-anonymity k={k}")
+
+    if supp_level > 100 or supp_level < 0:
+        raise ValueError(f"Invalid value of for the suppression level {supp_level}")
+
+    if loss not in _LOSS_METRICS:
+        raise ValueError(f"Invalid loss metric {loss}")
+
+    table = encode_table(data, [], quasi_ident, hierarchies)
+    hierarchies = table.hierarchies
+    quasi_ident = list(quasi_ident)
+    lowest = [table.gen_level.get(qi, 0) for qi in quasi_ident]
+    highest = [
+        hierarchies[qi].max_level if qi in table.gen_level else lowest[i]
+        for i, qi in enumerate(quasi_ident)
+    ]
+    shape = tuple(h - low + 1 for low, h in zip(lowest, highest))
+    if np.prod(shape, dtype=float) > _MAX_LATTICE_SIZE:
+        raise ValueError(f"The lattice of transformations is too large {shape}")
+
+    base = table.equiv_classes()
+    n = len(table)
+
+    # Code in each level of the codes of the data, for each QI
+    parents = []
+    for qi, low, size in zip(quasi_ident, lowest, shape):
+        parent = [np.arange(len(table.labels(qi)))]
+        for level in range(low, low + size - 1):
+            parent.append(hierarchies[qi].parent_map(level, level + 1)[parent[-1]])
+        parents.append(parent)
+
+    def evaluate(sizes, node):
+        records_sup = sum(sizes[sizes < k])
+        verified = max(sizes) >= k and records_sup * 100 / n <= supp_level
+        levels = [low + offset for low, offset in zip(lowest, node)]
+        node_loss = _LOSS_METRICS[loss](sizes, k, levels, highest, records_sup, n)
+        return verified, node_loss, _LOWER_BOUNDS[loss](sizes, levels, highest)
+
+    # Tags: 1 verifies k-anonymity, -1 does not, 0 unknown
+    tags = np.zeros(shape, dtype=np.int8)
+    losses = {}
+
+    def class_sizes(nodes):
+        if evaluator.n_jobs > 1:
+            return evaluator.class_sizes(nodes)
+        # Roll up the classes of the finest transformation already evaluated
+        return [
+            table.roll_up(
+                {
+                    qi: low + offset
+                    for qi, low, offset in zip(quasi_ident, lowest, node)
+                    if qi in table.gen_level
+                }
+            ).counts
+            for node in nodes
+        ]
+
+    def check(nodes):
+        for node, sizes in zip(nodes, class_sizes(nodes)):
+            verified, node_loss, bound = evaluate(sizes, node)
+            if verified:
+                tags[tuple(slice(i, None) for i in node)] = 1
+                losses[node] = (node_loss, bound)
+            else:
+                tags[tuple(slice(0, i + 1) for i in node)] = -1
+
+    with TransformationEvaluator(base, parents, n_jobs) as evaluator:
+        top = tuple(s - 1 for s in shape)
+        check([top])
+        if tags[top] != 1:
+            print(f"The anonymization cannot be carried out for the given value k={k}")
+            return []
+        _flash(tags, check, evaluator.n_jobs)
+        best = _best_transformation(
+            tags,
+            losses,
+            lambda nodes: [
+                evaluate(sizes, node)[1:]
+                for node, sizes in zip(nodes, class_sizes(nodes))
+            ],
+        )
+
+    return [low + offset for low, offset in zip(lowest, best)]
+
+
+def _best_transformation(
+    tags: np.ndarray, losses: dict, evaluate: typing.Callable
+) -> tuple:
+    """Get the transformation with the minimum loss among the verified ones.
+
+    The loss metrics are not monotonic when suppression is allowed, so all
+    the transformations verifying the privacy model are considered, from
+    the lowest ones up. Each loss has a lower bound which does not decrease
+    when generalizing, so a transformation is only evaluated if the bound
+    inherited from its predecessors is below the minimum loss found. The
+    transformations with the same height are evaluated together.
+
+    :param tags: 1 for the transformations verifying the privacy model, -1 for
+        those not verifying it.
+    :type tags: numpy array
+
+    :param losses: loss and lower bound of the transformations already
+        evaluated.
+    :type losses: dict
+
+    :param evaluate: function getting the loss and lower bound of each
+        transformation of a list.
+    :type evaluate: function
+
+    :return: transformation with the minimum loss (the lowest and then the
+        first one in case of a tie).
+    :rtype: tuple
+    """
+    shape = tags.shape
+    nodes = [tuple(int(i) for i in node) for node in np.argwhere(tags == 1)]
+    nodes.sort(key=lambda node: (sum(node), node))
+    bounds = np.full(shape, -np.inf)
+    best, best_loss = None, np.inf
+    for _, layer in itertools.groupby(nodes, key=sum):
+        pending = []
+        for node in layer:
+            # Bound inherited from the direct predecessors, all of them lower
+            for i in range(len(shape)):
+                if node[i] > 0:
+                    bounds[node] = max(
+                        bounds[node], bounds[node[:i] + (node[i] - 1,) + node[i + 1 :]]
+                    )
+            if best is None or bounds[node] < best_loss:
+                pending.append(node)
+
+        new = [node for node in pending if node not in losses]
+        if len(new) > 0:
+            losses.update(zip(new, evaluate(new)))
+        for node in pending:
+            node_loss, node_bound = losses[node]
+            bounds[node] = max(bounds[node], node_bound)
+            if node_loss < best_loss:
+                best, best_loss = node, node_loss
+    return best
+
+
+def _flash(
+    tags: np.ndarray, check: typing.Callable, n_jobs: typing.Optional[int]
+) -> None:
+    """Tag all the transformations of the lattice as in Flash.
+
+    Starting from the untagged transformation with the lowest height, a path
+    of untagged transformations is built upwards and searched: in each step,
+    the transformations evenly spaced among the untagged ones of the path (one
+    for each job, the middle one for a single job) are checked together.
+
+    :param tags: 1 for the transformations verifying the privacy model, -1 for
+        those not verifying it and 0 for the untagged ones.
+    :type tags: numpy array
+
+    :param check: function checking and tagging a list of transformations.
+    :type check: function
+
+    :param n_jobs: number of transformations checked together.
+    :type n_jobs: int
+    """
+    shape = tags.shape
+    height = np.indices(shape).sum(axis=0).ravel()
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    while True:
+        untagged = np.flatnonzero(tags == 0)
+        if len(untagged) == 0:
+            break
+        start = np.unravel_index(untagged[np.argmin(height[untagged])], shape)
+        path = [tuple(int(i) for i in start)]
+        while True:
+            node = path[-1]
+            successors = [
+                node[:i] + (node[i] + 1,) + node[i + 1 :]
+                for i in range(len(shape))
+                if node[i] + 1 < shape[i]
+            ]
+            successors = [s for s in successors if tags[s] == 0]
+            if len(successors) == 0:
+                break
+            path.append(successors[0])
+
+        while True:
+            pending = [node for node in path if tags[node] == 0]
+            if len(pending) == 0:
+                break
+            n_check = min(n_jobs, len(pending))
+            positions = {
+                (j + 1) * len(pending) // (n_check + 1) for j in range(n_check)
+            }
+            check([pending[i] for i in sorted(positions)])
+
+
+def _precision_loss(
+    sizes: np.ndarray,
+    k: int,
+    levels: list,
+    highest: list,
+    records_sup: int,
+    n: int,
+) -> float:
+    """Loss of precision of a transformation, suppressed records losing all.
+
+    :param sizes: size of the equivalence classes of the transformation.
+    :type sizes: numpy array
+
+    :param k: desired level of k-anonymity.
+    :type k: int
+
+    :param levels: level of generalization of each QI.
+    :type levels: list
+
+    :param highest: highest level of the hierarchy of each QI.
+    :type highest: list
+
+    :param records_sup: number of records suppressed.
+    :type records_sup: int
+
+    :param n: number of records.
+    :type n: int
+
+    :return: loss of precision, from 0 to 1.
+    :rtype: float
+    """
+    prec = np.mean([lev / h if h > 0 else 0.0 for lev, h in zip(levels, highest)])
+    return ((n - records_sup) * prec + records_sup) / n
+
+
+def _discernibility_loss(
+    sizes: np.ndarray,
+    k: int,
+    levels: list,
+    highest: list,
+    records_sup: int,
+    n: int,
+) -> float:
+    """Discernibility metric of a transformation.
+
+    :param sizes: size of the equivalence classes of the transformation.
+    :type sizes: numpy array
+
+    :param k: desired level of k-anonymity.
+    :type k: int
+
+    :param levels: level of generalization of each QI.
+    :type levels: list
+
+    :param highest: highest level of the hierarchy of each QI.
+    :type highest: list
+
+    :param records_sup: number of records suppressed.
+    :type records_sup: int
+
+    :param n: number of records.
+    :type n: int
+
+    :return: sum of the squared sizes of the classes, counting n for each
+        record suppressed.
+    :rtype: float
+    """
+    counts = sizes[sizes >= k].astype(float)
+    return float(sum(counts**2) + records_sup * n)
+
+
+def _precision_bound(sizes: np.ndarray, levels: list, highest: list) -> float:
+    """Lower bound of the loss of precision, not decreasing when generalizing.
+
+    :param sizes: size of the equivalence classes of the transformation.
+    :type sizes: numpy array
+
+    :param levels: level of generalization of each QI.
+    :type levels: list
+
+    :param highest: highest level of the hierarchy of each QI.
+    :type highest: list
+
+    :return: loss of precision of the records not suppressed.
+    :rtype: float
+    """
+    return float(
+        np.mean([lev / h if h > 0 else 0.0 for lev, h in zip(levels, highest)])
+    )
+
+
+def _discernibility_bound(sizes: np.ndarray, levels: list, highest: list) -> float:
+    """Lower bound of the discernibility, not decreasing when generalizing.
+
+    :param sizes: size of the equivalence classes of the transformation.
+    :type sizes: numpy array
+
+    :param levels: level of generalization of each QI.
+    :type levels: list
+
+    :param highest: highest level of the hierarchy of each QI.
+    :type highest: list
+
+    :return: sum of the squared sizes of all the classes, since each record
+        suppressed counts at least as the size of its class.
+    :rtype: float
+    """
+    return float(sum(sizes.astype(float) ** 2))
+
+
+_LOWER_BOUNDS = {
+    "precision": _precision_bound,
+    "discernibility": _discernibility_bound,
+}
+
+_LOSS_METRICS = {
+    "precision": _precision_loss,
+    "discernibility": _discernibility_loss,
+}
@@ -0,0 +1,790 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import abc
+import time
+from copy import copy
+
+import numpy as np
+import pandas as pd
+from anjana.anonymity.utils.encoding import EncodedData, EncodedTable, encode_table
+from anjana.anonymity.utils.metrics import (
+    ClassMetric,
+    beta_likeness,
+    emd_equal,
+    emd_ordered,
+    entropy,
+    log_ratio,
+    relative_distance,
+)
+from anjana.anonymity._result import AnonymizationResult, _output
+from beartype import beartype
+from beartype import typing
+
+
+class PrivacyModel(abc.ABC):
+    """Privacy model checked over the equivalence classes of the data.
+
+    Each model decides which equivalence classes verify it from their
+    statistics (sizes and histograms of the sensitive attribute), so several
+    models are checked over the classes obtained once for each
+    transformation. The models comparing the classes with the distribution of
+    the sensitive attribute keep the value of each class, so only the classes
+    merged in the last generalization are computed again.
+
+    New models are defined by subclassing it and implementing ``evaluate``
+    and ``achieved``.
+    """
+
+    #: Whether the model needs a sensitive attribute
+    needs_sens_att = False
+
+    #: Name of the model in the messages printed
+    name = "the privacy model"
+
+    #: Whether the function applying the model after k-anonymity (such as
+    #: ``l_diversity``) suppresses the records of the equivalence classes not
+    #: verifying it, otherwise the data is only generalized
+    stage_suppression = True
+
+    #: Whether the model compares the equivalence classes with the
+    #: distribution of the sensitive attribute in the data
+    compares_distribution = False
+
+    @abc.abstractmethod
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        """Check which equivalence classes of a table verify the model.
+
+        :param table: integer-coded data.
+        :type table: EncodedTable
+
+        :return: whether each equivalence class verifies the model.
+        :rtype: numpy array
+        """
+
+    @abc.abstractmethod
+    def achieved(self, table: EncodedTable) -> dict:
+        """Get the value of the parameter of the model achieved by a table.
+
+        :param table: integer-coded data.
+        :type table: EncodedTable
+
+        :return: value achieved of each parameter of the model.
+        :rtype: dict
+        """
+
+    def reset(self) -> None:
+        """Release the values kept for the table last evaluated."""
+
+    def __repr__(self):
+        params = ", ".join(f"{key}={value}" for key, value in self._params().items())
+        return f"{type(self).__name__}({params})"
+
+    def _params(self) -> dict:
+        return {}
+
+
+class _ClassMetricModel(PrivacyModel):
+    """Privacy model bounding a metric of each equivalence class."""
+
+    needs_sens_att = True
+
+    def __init__(self):
+        self._metric = None
+
+    @abc.abstractmethod
+    def metric(
+        self,
+        table: EncodedTable,
+        sens_hist: np.ndarray,
+        counts: np.ndarray,
+        distribution: np.ndarray,
+    ) -> np.ndarray:
+        """Get the value of the metric of some equivalence classes."""
+
+    def values(self, table: EncodedTable) -> np.ndarray:
+        """Get the value of the metric of each equivalence class of a table.
+
+        :param table: integer-coded data, with the sensitive attribute.
+        :type table: EncodedTable
+
+        :return: value of the metric of each equivalence class.
+        :rtype: numpy array
+        """
+        if self._metric is None or self._metric.table is not table:
+            self._metric = ClassMetric(table, lambda *args: self.metric(table, *args))
+        return self._metric.update()
+
+    def reset(self) -> None:
+        self._metric = None
+
+
+class KAnonymity(PrivacyModel):
+    """k-anonymity: each equivalence class has at least k records.
+
+    :param k: desired level of k-anonymity.
+    :type k: int
+    """
+
+    name = "k-anonymity"
+
+    @beartype()
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError(f"Invalid value of k for k-anonymity k={k}")
+        self.k = k
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        return table.equiv_classes().counts >= self.k
+
+    def achieved(self, table: EncodedTable) -> dict:
+        return {"k": int(table.equiv_classes().k)}
+
+    def _params(self) -> dict:
+        return {"k": self.k}
+
+
+class AlphaAnonymity(PrivacyModel):
+    """alpha-anonymity: the relative frequency of each value of the SA in
+    each equivalence class is at most alpha.
+
+    Combined with ``KAnonymity`` it gives (alpha,k)-anonymity.
+
+    :param alpha: desired level of alpha.
+    :type alpha: float
+    """
+
+    name = "alpha-anonymity"
+
+    needs_sens_att = True
+
+    @beartype()
+    def __init__(self, alpha: typing.Union[float, int]):
+        if alpha > 1 or alpha < 0:
+            raise ValueError(
+                f"Invalid value of alpha for (alpha,k)-anonymity alpha={alpha}"
+            )
+        self.alpha = alpha
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        return _alpha_ec(table) <= self.alpha
+
+    def achieved(self, table: EncodedTable) -> dict:
+        return {"alpha": float(max(_alpha_ec(table)))}
+
+    def _params(self) -> dict:
+        return {"alpha": self.alpha}
+
+
+class LDiversity(PrivacyModel):
+    """l-diversity: each equivalence class has at least l different values
+    of the sensitive attribute.
+
+    :param l_div: desired level of l-diversity.
+    :type l_div: int
+    """
+
+    name = "l-diversity"
+    stage_suppression = False
+
+    needs_sens_att = True
+
+    @beartype()
+    def __init__(self, l_div: int):
+        if l_div < 1:
+            raise ValueError(f"Invalid value of l for l-diversity l={l_div}")
+        self.l_div = l_div
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        return _diversity_ec(table) >= self.l_div
+
+    def achieved(self, table: EncodedTable) -> dict:
+        return {"l_div": int(min(_diversity_ec(table)))}
+
+    def _params(self) -> dict:
+        return {"l_div": self.l_div}
+
+
+class EntropyLDiversity(_ClassMetricModel):
+    """Entropy l-diversity: the exponential of the entropy of the sensitive
+    attribute in each equivalence class is at least l.
+
+    :param l_div: desired level of entropy l-diversity.
+    :type l_div: int
+    """
+
+    name = "entropy l-diversity"
+    stage_suppression = False
+
+    @beartype()
+    def __init__(self, l_div: int):
+        if l_div < 1:
+            raise ValueError(f"Invalid value of l for l-diversity l={l_div}")
+        super().__init__()
+        self.l_div = l_div
+
+    def metric(self, table, sens_hist, counts, distribution):
+        return np.floor(np.exp(entropy(sens_hist, counts, distribution)))
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        return self.values(table) >= self.l_div
+
+    def achieved(self, table: EncodedTable) -> dict:
+        return {"entropy_l_div": int(min(self.values(table)))}
+
+    def _params(self) -> dict:
+        return {"l_div": self.l_div}
+
+
+class RecursiveCLDiversity(PrivacyModel):
+    """Recursive (c,l)-diversity: each equivalence class has at least l
+    different values of the sensitive attribute, and the value of c of the
+    data (the highest of its classes) is at least the one desired, as in
+    ``recursive_c_l_diversity``.
+
+    :param c: desired value of c.
+    :type c: int
+
+    :param l_div: desired level of l-diversity.
+    :type l_div: int
+    """
+
+    name = "recursive (c,l)-diversity"
+
+    needs_sens_att = True
+
+    @beartype()
+    def __init__(self, c: int, l_div: int):
+        if c < 1:
+            raise ValueError(f"Invalid value of c for recursive (c,l)-diversity, c={c}")
+        if l_div < 1:
+            raise ValueError(f"Invalid value of l for l-diversity l={l_div}")
+        self.c = c
+        self.l_div = l_div
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        sens_hist = table.sens_hist()
+        c_real, l_real = _recursive_c_l(sens_hist)
+        if l_real >= self.l_div and c_real >= self.c:
+            return np.ones(len(sens_hist), dtype=bool)
+
+        # Only the classes with the value of c desired are kept, if the
+        # records left verify the model with a higher value of c
+        diverse = np.count_nonzero(sens_hist, axis=1) >= self.l_div
+        kept = diverse & (_recursive_c_ec(sens_hist, self.l_div) >= self.c)
+        if kept.any():
+            c_kept, l_kept = _recursive_c_l(sens_hist[kept])
+            if l_kept >= self.l_div and c_kept > self.c:
+                return kept
+        return np.zeros(len(sens_hist), dtype=bool)
+
+    def achieved(self, table: EncodedTable) -> dict:
+        c_real, l_real = _recursive_c_l(table.sens_hist())
+        return {"c": c_real, "l_div": l_real}
+
+    def _params(self) -> dict:
+        return {"c": self.c, "l_div": self.l_div}
+
+
+class TCloseness(_ClassMetricModel):
+    """t-closeness: the EMD between the distribution of the SA in each
+    equivalence class and in the data is at most t.
+
+    :param t: desired level of t-closeness.
+    :type t: float
+    """
+
+    name = "t-closeness"
+    stage_suppression = False
+    compares_distribution = True
+
+    @beartype()
+    def __init__(self, t: typing.Union[float, int]):
+        if t < 0 or t > 1:
+            raise ValueError(f"Invalid value of t for t-closeness, t={t}")
+        super().__init__()
+        self.t = t
+
+    def metric(self, table, sens_hist, counts, distribution):
+        return _emd(table, sens_hist, counts, distribution)
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        return self.values(table) <= self.t
+
+    def achieved(self, table: EncodedTable) -> dict:
+        return {"t": float(max(self.values(table)))}
+
+    def _params(self) -> dict:
+        return {"t": self.t}
+
+
+class BasicBetaLikeness(_ClassMetricModel):
+    """Basic beta-likeness: the relative distance between the frequency of
+    each value of the SA in each equivalence class and in the data is at most
+    beta.
+
+    :param beta: desired level of beta-likeness.
+    :type beta: float
+    """
+
+    name = "basic beta-likeness"
+    stage_suppression = False
+    compares_distribution = True
+
+    @beartype()
+    def __init__(self, beta: typing.Union[float, int]):
+        if beta < 0:
+            raise ValueError(f"Invalid value of beta for beta-likeness, beta={beta}")
+        super().__init__()
+        self.beta = beta
+
+    def metric(self, table, sens_hist, counts, distribution):
+        return relative_distance(sens_hist, counts, distribution)
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        return self.values(table) <= self.beta
+
+    def achieved(self, table: EncodedTable) -> dict:
+        return {"beta": float(max(self.values(table)))}
+
+    def _params(self) -> dict:
+        return {"beta": self.beta}
+
+
+class EnhancedBetaLikeness(_ClassMetricModel):
+    """Enhanced beta-likeness: the highest, over the values of the SA, of the
+    minimum of the basic beta of the data and minus the logarithm of the
+    frequency of the value in the data is at most beta, as in
+    ``enhanced_beta_likeness``.
+
+    :param beta: desired level of beta-likeness.
+    :type beta: float
+    """
+
+    name = "enhanced beta-likeness"
+    stage_suppression = False
+    compares_distribution = True
+
+    @beartype()
+    def __init__(self, beta: typing.Union[float, int]):
+        if beta < 0:
+            raise ValueError(f"Invalid value of beta for beta-likeness, beta={beta}")
+        super().__init__()
+        self.beta = beta
+
+    def metric(self, table, sens_hist, counts, distribution):
+        return relative_distance(sens_hist, counts, distribution)
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        values = self.values(table)
+        if max(-np.log(self._metric.distribution)) <= self.beta:
+            # Verified whatever the basic beta of the data
+            return np.ones(len(values), dtype=bool)
+        return values <= self.beta
+
+    def achieved(self, table: EncodedTable) -> dict:
+        self.values(table)
+        return {"enhanced_beta": float(beta_likeness(self._metric)[1])}
+
+    def _params(self) -> dict:
+        return {"beta": self.beta}
+
+
+class DeltaDisclosure(_ClassMetricModel):
+    """delta-disclosure privacy: the absolute value of the logarithm of the
+    ratio between the frequency of each value of the SA in each equivalence
+    class and in the data is at most delta.
+
+    :param delta: desired level of delta-disclosure privacy.
+    :type delta: float
+    """
+
+    name = "delta-disclosure privacy"
+    stage_suppression = False
+    compares_distribution = True
+
+    @beartype()
+    def __init__(self, delta: typing.Union[float, int]):
+        if delta < 0:
+            raise ValueError(
+                f"Invalid value of delta for delta-disclosure, delta={delta}"
+            )
+        super().__init__()
+        self.delta = delta
+
+    def metric(self, table, sens_hist, counts, distribution):
+        return log_ratio(sens_hist, counts, distribution)
+
+    def evaluate(self, table: EncodedTable) -> np.ndarray:
+        return self.values(table) <= self.delta
+
+    def achieved(self, table: EncodedTable) -> dict:
+        return {"delta": float(max(self.values(table)))}
+
+    def _params(self) -> dict:
+        return {"delta": self.delta}
+
+
+@beartype()
+def anonymize(
+    data: typing.Union[pd.DataFrame, EncodedData],
+    ident: typing.Union[typing.List, np.ndarray],
+    quasi_ident: typing.Union[typing.List, np.ndarray],
+    sens_att: typing.Optional[str],
+    models: typing.List[PrivacyModel],
+    supp_level: typing.Union[float, int],
+    hierarchies: dict,
+    return_result: bool = False,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
+    """Anonymize a dataset verifying several privacy models at once.
+
+    Instead of applying each model to the data anonymized with the previous
+    one, the transformation is searched once: in each step all the models
+    are checked over the same equivalence classes, and the records of the
+    classes not verifying all of them are suppressed if the suppression
+    level allows it.
+
+    Example: models=[KAnonymity(10), LDiversity(2), TCloseness(0.5)]
+
+    :param data: data under study.
+    :type data: pandas dataframe or EncodedData
+
+    :param ident: list with the name of the columns of the dataframe
+        that are identifiers.
+    :type ident: list of strings
+
+    :param quasi_ident: list with the name of the columns of the dataframe
+        that are quasi-identifiers.
+    :type quasi_ident: list of strings
+
+    :param sens_att: string with the name of the sensitive attribute, None if
+        none of the models needs it.
+    :type sens_att: string
+
+    :param models: privacy models to be verified.
+    :type models: list of PrivacyModel
+
+    :param supp_level: maximum level of record suppression allowed
+        (from 0 to 100).
+    :type supp_level: float
+
+    :param hierarchies: hierarchies for generalizing the QI.
+    :type hierarchies: dictionary containing one dictionary for QI
+        with the hierarchies and the levels
+
+    :param return_result: whether to return the anonymized data along with
+        the transformation applied, the records suppressed and the value
+        achieved of the parameter of each model.
+    :type return_result: bool
+
+    :return: anonymized data, or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
+    """
+    if supp_level > 100 or supp_level < 0:
+        raise ValueError(f"Invalid value of for the suppression level {supp_level}")
+
+    start = time.perf_counter()
+    table = encode_table(data, ident, quasi_ident, hierarchies, sens_att)
+    table_anon = _greedy_search(table, models, supp_level)
+    if table_anon is None:
+        print(f"The anonymization cannot be carried out for the models {models}")
+
+    return _output(
+        table if table_anon is None else table_anon,
+        table_anon is not None,
+        start,
+        _achieved(models),
+        return_result,
+    )
+
+
+def _apply_models(
+    table: EncodedTable,
+    models: typing.List[PrivacyModel],
+    supp_level: typing.Union[float, int],
+) -> typing.Tuple[EncodedTable, bool]:
+    """Apply some privacy models to a table already anonymized.
+
+    The table is generalized with ``_greedy_search``, counting the records
+    already suppressed for the suppression level allowed.
+
+    :param table: integer-coded data, with the sensitive attribute if any of
+        the models needs it.
+    :type table: EncodedTable
+
+    :param models: privacy models to be verified.
+    :type models: list of PrivacyModel
+
+    :param supp_level: maximum level of record suppression allowed
+        (from 0 to 100), ignored if any of the models is applied without
+        suppression (``stage_suppression``).
+    :type supp_level: float
+
+    :return: table with the generalization applied and the records
+        suppressed, and whether it verifies the models.
+    :rtype: tuple
+    """
+    if not all(model.stage_suppression for model in models):
+        supp_level = 0
+    gen_level = dict(table.gen_level)
+    n = len(table.data)
+    table_anon = _greedy_search(table, models, supp_level, n - len(table), n)
+    names = " and ".join(model.name for model in models)
+
+    if table_anon is None:
+        params = ", ".join(
+            f"{key}={value}"
+            for model in models
+            for key, value in model._params().items()
+        )
+        print(f"The anonymization cannot be carried out for {names} with {params}")
+        return table, False
+
+    if table_anon is table and table.gen_level == gen_level:
+        values = ", ".join(
+            f"{key}={value}" for key, value in _achieved(models)(table).items()
+        )
+        print(f"The data verifies {names} with {values}")
+    return table_anon, True
+
+
+def _achieved(models: typing.List[PrivacyModel]) -> typing.Callable:
+    """Get the function giving the values achieved of the parameters of some
+    privacy models.
+
+    :param models: privacy models verified.
+    :type models: list of PrivacyModel
+
+    :return: function giving the value achieved of each parameter of the
+        models by a table.
+    :rtype: function
+    """
+
+    def achieved(table: EncodedTable) -> dict:
+        try:
+            return {
+                key: value
+                for model in models
+                for key, value in model.achieved(table).items()
+            }
+        finally:
+            for model in models:
+                model.reset()
+
+    return achieved
+
+
+def _greedy_search(
+    table: EncodedTable,
+    models: typing.List[PrivacyModel],
+    supp_level: typing.Union[float, int],
+    supp_records: int = 0,
+    n: typing.Optional[int] = None,
+) -> typing.Optional[EncodedTable]:
+    """Generalize a table until it verifies several privacy models at once.
+
+    In each step, all the models are checked over the same equivalence
+    classes. If some classes verify all of them, and the records of the rest
+    can be suppressed within the suppression level allowed, they are
+    suppressed. Otherwise, the quasi-identifier with the most different
+    values is generalized.
+
+    The models comparing the classes with the distribution of the sensitive
+    attribute (``compares_distribution``) are checked again over the records
+    kept, as suppressing records changes the distribution; if they are not
+    verified, the table is generalized further.
+
+    :param table: integer-coded data, with the sensitive attribute if any of
+        the models needs it.
+    :type table: EncodedTable
+
+    :param models: privacy models to be verified.
+    :type models: list of PrivacyModel
+
+    :param supp_level: maximum level of record suppression allowed
+        (from 0 to 100).
+    :type supp_level: float
+
+    :param supp_records: number of records already suppressed.
+    :type supp_records: int
+
+    :param n: number of records of the data under study, by default the ones
+        of the table.
+    :type n: int
+
+    :return: table verifying all the models, or None if they cannot be
+        verified.
+    :rtype: EncodedTable
+    """
+    if len(models) == 0:
+        raise ValueError("At least one privacy model must be given")
+    if table.sens_att is None and any(model.needs_sens_att for model in models):
+        raise ValueError("A sensitive attribute is needed for the privacy models")
+    n = len(table) if n is None else n
+    quasi_ident_gen = list(table.quasi_ident)
+
+    try:
+        while True:
+            verified = np.logical_and.reduce(
+                [model.evaluate(table) for model in models]
+            )
+            if verified.all():
+                return table
+
+            classes = table.equiv_classes()
+            if verified.any():
+                records_sup = sum(classes.counts[~verified])
+                if (records_sup + supp_records) * 100 / n <= supp_level:
+                    table_supp = table.suppress(verified)
+                    if _verifies_after_suppression(table_supp, models):
+                        return table_supp
+
+            if len(quasi_ident_gen) == 0:
+                return None
+            table.generalize_greedy(quasi_ident_gen)
+    finally:
+        for model in models:
+            model.reset()
+
+
+def _verifies_after_suppression(
+    table: EncodedTable, models: typing.List[PrivacyModel]
+) -> bool:
+    """Check whether a table with some records suppressed verifies the models.
+
+    Only the models comparing the classes with the distribution of the
+    sensitive attribute are checked again, on copies of them, so the values
+    kept by the models for the table not suppressed are not lost.
+
+    :param table: integer-coded data, with the records of the classes not
+        verifying the models suppressed.
+    :type table: EncodedTable
+
+    :param models: privacy models verified before the suppression.
+    :type models: list of PrivacyModel
+
+    :return: whether all the equivalence classes verify the models.
+    :rtype: bool
+    """
+    for model in models:
+        if model.compares_distribution:
+            checked = copy(model)
+            checked.reset()
+            if not checked.evaluate(table).all():
+                return False
+    return True
+
+
+def _alpha_ec(table: EncodedTable) -> np.ndarray:
+    """Get the alpha of each equivalence class.
+
+    :param table: integer-coded data, with the sensitive attribute.
+    :type table: EncodedTable
+
+    :return: highest relative frequency of a value of the sensitive
+        attribute in each equivalence class.
+    :rtype: numpy array
+    """
+    return table.sens_hist().max(axis=1) / table.equiv_classes().counts
+
+
+def _diversity_ec(table: EncodedTable) -> np.ndarray:
+    """Get the number of different values of the SA in each equivalence class.
+
+    :param table: integer-coded data, with the sensitive attribute.
+    :type table: EncodedTable
+
+    :return: number of different values of the sensitive attribute in each
+        equivalence class.
+    :rtype: numpy array
+    """
+    return np.count_nonzero(table.sens_hist(), axis=1)
+
+
+def _recursive_c_ec(sens_hist: np.ndarray, l_div: int) -> np.ndarray:
+    """Get the value of c of each equivalence class for a given l.
+
+    :param sens_hist: number of records of each equivalence class (rows) with
+        each value of the sensitive attribute (columns).
+    :type sens_hist: numpy array
+
+    :param l_div: level of l-diversity.
+    :type l_div: int
+
+    :return: value of c of each equivalence class (inf if the class has less
+        than l different values).
+    :rtype: numpy array
+    """
+    n_values = sens_hist.shape[1]
+    rows = np.arange(len(sens_hist))
+    # Frequencies sorted in ascending order, the ones of the values not
+    # present in the class first
+    r_ec = np.sort(sens_hist, axis=1)
+    first = n_values - np.count_nonzero(sens_hist, axis=1)
+    cumsum = np.cumsum(r_ec, axis=1)
+    start = first + l_div - 1
+    before = np.where(start > 0, cumsum[rows, np.clip(start - 1, 0, n_values - 1)], 0)
+    with np.errstate(divide="ignore"):
+        return np.floor(r_ec[rows, first] / (cumsum[:, -1] - before) + 1)
+
+
+def _recursive_c_l(sens_hist: np.ndarray) -> typing.Tuple[float, int]:
+    """Get the values of c and l for recursive (c,l)-diversity.
+
+    :param sens_hist: number of records of each equivalence class (rows) with
+        each value of the sensitive attribute (columns).
+    :type sens_hist: numpy array
+
+    :return: c and l values for recursive (c,l)-diversity (c is NaN if l
+        is 1).
+    :rtype: c is a float, l is an int.
+    """
+    l_real = int(min(np.count_nonzero(sens_hist, axis=1)))
+    if l_real <= 1:
+        return np.nan, l_real
+    return int(max(_recursive_c_ec(sens_hist, l_real))), l_real
+
+
+def _emd(
+    table: EncodedTable,
+    sens_hist: np.ndarray,
+    counts: np.ndarray,
+    distribution: np.ndarray,
+) -> np.ndarray:
+    """Get the EMD of some equivalence classes according to the type of the SA.
+
+    :param table: integer-coded data, with the sensitive attribute.
+    :type table: EncodedTable
+
+    :param sens_hist: number of records of each equivalence class (rows) with
+        each value of the sensitive attribute (columns).
+    :type sens_hist: numpy array
+
+    :param counts: size of each equivalence class.
+    :type counts: numpy array
+
+    :param distribution: distribution of the sensitive attribute in the data.
+    :type distribution: numpy array
+
+    :return: EMD of each equivalence class.
+    :rtype: numpy array
+    """
+    sens_values = pd.Series(table.sens_values)
+    if pd.api.types.is_numeric_dtype(sens_values):
+        return emd_ordered(sens_hist, counts, distribution)
+    if pd.api.types.is_string_dtype(sens_values):
+        return emd_equal(sens_hist, counts, distribution)
+    raise ValueError("Error, invalid sens_att value type")
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+import numpy as np
+import pandas as pd
+from anjana.anonymity.utils.encoding import EncodedTable
+from beartype import typing
+
+
+class AnonymizationResult:
+    """Anonymized data along with the state of the anonymization.
+
+    Returned by the anonymization functions when ``return_result=True``, so
+    the transformation applied and the records suppressed are known without
+    checking the anonymized data again.
+
+    :param data: anonymized data, empty if the privacy models cannot be
+        verified.
+    :type data: pandas dataframe
+
+    :param transformation: level of generalization applied to each QI (0 for
+        those without hierarchy), as returned by ``get_transformation``.
+    :type transformation: list
+
+    :param suppressed: position in the data given of each record suppressed.
+    :type suppressed: numpy array
+
+    :param achieved: value achieved of the parameter of each privacy model
+        (for instance ``{"k": 12, "l_div": 2}``).
+    :type achieved: dict
+
+    :param timings: seconds spent searching the transformation ("search"),
+        building the anonymized data ("decode") and in total ("total").
+    :type timings: dict
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        transformation: list,
+        suppressed: np.ndarray,
+        achieved: dict,
+        timings: dict,
+    ):
+        self.data = data
+        self.transformation = transformation
+        self.suppressed = suppressed
+        self.achieved = achieved
+        self.timings = timings
+
+    def __repr__(self):
+        return (
+            f"AnonymizationResult(records={len(self.data)}, "
+            f"transformation={self.transformation}, "
+            f"suppressed={len(self.suppressed)}, achieved={self.achieved})"
+        )
+
+    @classmethod
+    def from_table(
+        cls,
+        table: EncodedTable,
+        verified: bool,
+        start: float,
+        achieved: typing.Callable,
+    ) -> "AnonymizationResult":
+        """Build the result of an anonymization from the integer-coded data.
+
+        :param table: integer-coded data, with the generalization applied and
+            the records suppressed.
+        :type table: EncodedTable
+
+        :param verified: whether the table verifies the privacy models.
+        :type verified: bool
+
+        :param start: time when the anonymization started, as given by
+            ``time.perf_counter``.
+        :type start: float
+
+        :param achieved: function getting the value achieved of the parameter
+            of each privacy model from the table.
+        :type achieved: function
+
+        :return: result of the anonymization.
+        :rtype: AnonymizationResult
+        """
+        search = time.perf_counter() - start
+        values = achieved(table)
+        data = table.decode() if verified else pd.DataFrame()
+        total = time.perf_counter() - start
+        if table.rows is None:
+            suppressed = np.array([], dtype=np.int64)
+        else:
+            suppressed = np.setdiff1d(np.arange(len(table.data)), table.rows)
+        return cls(
+            data,
+            [table.gen_level.get(qi, 0) for qi in table.quasi_ident],
+            suppressed,
+            values,
+            {"search": search, "decode": total - search, "total": total},
+        )
+
+
+def _output(
+    table: EncodedTable,
+    verified: bool,
+    start: float,
+    achieved: typing.Callable,
+    return_result: bool,
+) -> typing.Union[pd.DataFrame, AnonymizationResult]:
+    """Get the output of an anonymization function.
+
+    :param table: integer-coded data, with the generalization applied and
+        the records suppressed.
+    :type table: EncodedTable
+
+    :param verified: whether the table verifies the privacy models.
+    :type verified: bool
+
+    :param start: time when the anonymization started, as given by
+        ``time.perf_counter``.
+    :type start: float
+
+    :param achieved: function getting the value achieved of the parameter of
+        each privacy model from the table.
+    :type achieved: function
+
+    :param return_result: whether to return the result of the anonymization
+        instead of the anonymized data.
+    :type return_result: bool
+
+    :return: anonymized data (empty if the privacy models cannot be
+        verified), or result of the anonymization.
+    :rtype: pandas dataframe or AnonymizationResult
+    """
+    if return_result:
+        return AnonymizationResult.from_table(table, verified, start, achieved)
+    return table.decode() if verified else pd.DataFrame()
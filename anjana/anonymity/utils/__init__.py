@@ -15,6 +15,7 @@
 # under the License.
 
 """Package containing auxiliary functions for performing the anonymization."""
+
 from .utils import (
     suppress_identifiers,
     apply_hierarchy,
@@ -23,6 +24,15 @@ from .utils import (
     apply_transformation,
     generate_intervals,
 )
+from .hierarchy import (
+    Hierarchy,
+    HierarchySet,
+    compile_hierarchy,
+    compile_hierarchies,
+    numeric_hierarchy,
+)
+from .cache import ClassStatsCache, class_stats_cache
+from .encoding import EncodedData
 
 __all__ = [
     "suppress_identifiers",
@@ -31,4 +41,12 @@ __all__ = [
     "get_transformation",
     "apply_transformation",
     "generate_intervals",
+    "Hierarchy",
+    "HierarchySet",
+    "compile_hierarchy",
+    "compile_hierarchies",
+    "numeric_hierarchy",
+    "ClassStatsCache",
+    "class_stats_cache",
+    "EncodedData",
 ]
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Module with the cache of the statistics of the equivalence classes."""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from beartype import beartype
+from beartype import typing
+from anjana.anonymity.utils.equiv_class import EquivalenceClasses
+
+
+@beartype()
+def fingerprint(columns: typing.List[tuple]) -> str:
+    """Get a fingerprint of some integer-coded columns of a dataset.
+
+    Only the codes of the records and the values of the codes are hashed,
+    which is much cheaper than hashing the value of each record.
+
+    :param columns: name, code of each record and value of each code (or
+        level of the hierarchy giving them) of each column, in order.
+    :type columns: list of tuples
+
+    :return: hash of the codes and values of the columns.
+    :rtype: string
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for name, codes, labels in columns:
+        digest.update(repr((str(name), len(codes))).encode())
+        digest.update(np.ascontiguousarray(codes))
+        if isinstance(labels, np.ndarray):
+            digest.update(pd.util.hash_array(labels).tobytes())
+        else:
+            digest.update(repr(labels).encode())
+    return digest.hexdigest()
+
+
+class ClassStatsCache:
+    """Cache of the statistics of the equivalence classes of transformations.
+
+    The equivalence classes (sizes and, once computed, histograms of the
+    sensitive attribute) are stored by the fingerprint of the data, the
+    quasi-identifiers, the sensitive attribute, the fingerprint of the
+    hierarchies and the transformation applied,
+    so anonymizing the same data again with other parameters reuses them
+    instead of grouping the records. The least recently used entries are
+    evicted when the memory used exceeds the bound given, the class of each
+    record being counted in full for each entry.
+
+    The classes stored are shared by all the tables getting them, so their
+    arrays are made read-only: they can be completed (and stored again, in
+    order to update the memory used) but not modified in place.
+
+    :param max_bytes: maximum memory used by the entries, 0 for disabling
+        the cache.
+    :type max_bytes: int
+    """
+
+    @beartype()
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        if max_bytes < 0:
+            raise ValueError(f"Invalid size for the cache {max_bytes}")
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Transformations stored for each data, QI, SA and hierarchies
+        self._levels = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key: tuple) -> typing.Optional[EquivalenceClasses]:
+        """Get the equivalence classes of a transformation, if stored.
+
+        :param key: fingerprint of the data, quasi-identifiers, sensitive
+            attribute, fingerprint of the hierarchies and level of each QI.
+        :type key: tuple
+
+        :return: equivalence classes, or None if they are not stored.
+        :rtype: EquivalenceClasses
+        """
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def finer(
+        self, key: tuple
+    ) -> typing.Optional[typing.Tuple[tuple, EquivalenceClasses]]:
+        """Get the stored transformation closest to a given one among the finer.
+
+        A transformation is finer than another one if the level of each QI
+        is lower or equal, so its classes can be rolled up to the classes of
+        the other one. The one with the fewest classes is returned.
+
+        :param key: fingerprint of the data, quasi-identifiers, sensitive
+            attribute, fingerprint of the hierarchies and level of each QI.
+        :type key: tuple
+
+        :return: level of each QI and equivalence classes of the finer
+            transformation, or None if no one is stored.
+        :rtype: tuple
+        """
+        *prefix, levels = key
+        prefix = tuple(prefix)
+        stored = self._levels.get(prefix, {})
+        if len(stored) == 0:
+            return None
+        # Levels of the QI without hierarchy are None (-1) in all the entries
+        target = np.array([-1 if lev is None else lev for lev in levels])
+        candidates = np.array(list(stored.values())).reshape(len(stored), len(levels))
+        finer = np.flatnonzero((candidates <= target).all(axis=1))
+        stored = list(stored)
+        entries = [
+            (stored[i], self._entries[prefix + (stored[i],)][0])
+            for i in finer
+            if stored[i] != levels
+        ]
+        if len(entries) == 0:
+            return None
+        best = min(entries, key=lambda entry: len(entry[1]))
+        self._entries.move_to_end(prefix + (best[0],))
+        return best
+
+    def put(self, key: tuple, classes: EquivalenceClasses) -> None:
+        """Store the equivalence classes of a transformation.
+
+        Storing them again updates the memory used, for instance when their
+        histograms have been computed. Their arrays are made read-only.
+
+        :param key: fingerprint of the data, quasi-identifiers, sensitive
+            attribute, fingerprint of the hierarchies and level of each QI.
+        :type key: tuple
+
+        :param classes: equivalence classes of the transformation.
+        :type classes: EquivalenceClasses
+        """
+        if key in self._entries:
+            self._remove(key)
+        nbytes = classes.nbytes
+        if nbytes > self.max_bytes:
+            return
+        classes.freeze()
+        self._entries[key] = (classes, nbytes)
+        self._levels.setdefault(key[:-1], {})[key[-1]] = tuple(
+            -1 if lev is None else lev for lev in key[-1]
+        )
+        self.nbytes += nbytes
+        self._evict()
+
+    def _remove(self, key: tuple) -> None:
+        """Remove an entry of the cache.
+
+        :param key: key of the entry.
+        :type key: tuple
+        """
+        _, nbytes = self._entries.pop(key)
+        self.nbytes -= nbytes
+        stored = self._levels[key[:-1]]
+        del stored[key[-1]]
+        if len(stored) == 0:
+            del self._levels[key[:-1]]
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries exceeding the memory bound."""
+        while self.nbytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the maximum memory used, evicting entries if needed.
+
+        :param max_bytes: maximum memory used by the entries, 0 for disabling
+            the cache.
+        :type max_bytes: int
+        """
+        if max_bytes < 0:
+            raise ValueError(f"Invalid size for the cache {max_bytes}")
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove all the entries of the cache."""
+        self._entries.clear()
+        self._levels.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+# Cache shared by all the anonymization functions
+class_stats_cache = ClassStatsCache()
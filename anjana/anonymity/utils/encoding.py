@@ -0,0 +1,773 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Module with the integer-coded representation of the data under study."""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from beartype import beartype
+from beartype import typing
+from copy import copy
+from anjana.anonymity.utils.utils import check_gen_level, suppress_identifiers
+from anjana.anonymity.utils.equiv_class import EquivalenceClasses
+from anjana.anonymity.utils.cache import class_stats_cache, fingerprint
+from anjana.anonymity.utils.hierarchy import (
+    HierarchySet,
+    _restored,
+    _storable,
+    compile_hierarchies,
+)
+
+
+class EncodedTable:
+    """Integer-coded representation of the data under study.
+
+    Each quasi-identifier is stored as the codes of its values in the level of
+    the hierarchy currently applied, and the sensitive attribute as the codes
+    of its sorted values. Generalizing a quasi-identifier composes the parent
+    codes of the hierarchy, which are only gathered over the records when they
+    are needed, and the labels are only recovered when the data is decoded.
+    Categorical columns are encoded from their codes, and the QI generalized
+    are decoded as categorical columns too. Data already encoded is not
+    encoded again, its codes being used as they are.
+    The equivalence classes of the whole data are stored in the cache of
+    class statistics, so they are reused for the same data and transformation.
+
+    :param data: data under study, or its columns already encoded.
+    :type data: pandas dataframe or EncodedData
+
+    :param quasi_ident: list with the name of the columns of the dataframe
+        that are quasi-identifiers.
+    :type quasi_ident: list of strings
+
+    :param hierarchies: compiled hierarchies for generalizing the QI.
+    :type hierarchies: dictionary containing one Hierarchy for QI
+
+    :param sens_att: string with the name of the sensitive attribute.
+    :type sens_att: string
+
+    :param gen_level: level of generalization applied to each QI of a
+        dataframe. If not given, it is obtained from the data.
+    :type gen_level: dict
+    """
+
+    @beartype()
+    def __init__(
+        self,
+        data: typing.Union[pd.DataFrame, "EncodedData"],
+        quasi_ident: typing.Union[typing.List, np.ndarray],
+        hierarchies: dict,
+        sens_att: typing.Optional[str] = None,
+        gen_level: typing.Optional[dict] = None,
+    ):
+        columns = list(quasi_ident) + ([] if sens_att is None else [sens_att])
+        missing = [col for col in columns if col not in data.columns]
+        if len(missing) > 0:
+            raise ValueError(f"Columns {missing} are not in the given dataset")
+
+        self.data = data
+        self.quasi_ident = list(quasi_ident)
+        self.sens_att = sens_att
+        self.hierarchies = hierarchies
+        self.rows = None
+        self._labels = {}
+        self._classes = None
+        self._pending = {}
+        self._fingerprint = None
+        self._codes = {}
+        if isinstance(data, EncodedData):
+            self._take_encoded(data)
+        else:
+            self._encode(data, gen_level)
+        self._initial_level = dict(self.gen_level)
+        if class_stats_cache.max_bytes > 0:
+            self._fingerprint = (
+                data.fingerprint
+                if isinstance(data, EncodedData)
+                else self._codes_fingerprint()
+            )
+
+    def _encode(self, data: pd.DataFrame, gen_level: typing.Optional[dict]) -> None:
+        """Encode the QI and sensitive attribute of a dataframe.
+
+        :param data: data under study.
+        :type data: pandas dataframe
+
+        :param gen_level: level of generalization applied to each QI. If not
+            given, it is obtained from the data.
+        :type gen_level: dict
+        """
+        if gen_level is None:
+            gen_level = check_gen_level(data, self.quasi_ident, self.hierarchies)
+        self.gen_level = gen_level
+        self._categorical = {
+            qi
+            for qi in self.quasi_ident
+            if isinstance(data[qi].dtype, pd.CategoricalDtype)
+        }
+
+        for qi in self.quasi_ident:
+            values = data[qi].values
+            if qi in gen_level:
+                self._codes[qi] = self.hierarchies[qi].encode(values, gen_level[qi])
+            else:
+                codes, self._labels[qi] = pd.factorize(values, use_na_sentinel=False)
+                self._codes[qi] = codes.astype(np.int32)
+
+        if self.sens_att is not None:
+            self._encode_sens_att(data[self.sens_att].values)
+
+    def _take_encoded(self, data: "EncodedData") -> None:
+        """Take the codes of the QI and sensitive attribute already encoded.
+
+        The codes of a QI are used as they are (so memory-mapped codes are
+        shared, not copied) if it is given the hierarchy it was encoded with,
+        or none. Otherwise, only the values of the codes are looked up in its
+        hierarchy, and the codes of the records are mapped to the new ones.
+
+        :param data: integer-coded data.
+        :type data: EncodedData
+        """
+        self.gen_level = {}
+        self._categorical = set()
+        for qi in self.quasi_ident:
+            codes, labels = data.columns[qi]
+            codes = np.asarray(codes)
+            if not pd.isna(labels).any():
+                self._categorical.add(qi)
+            hierarchy = self.hierarchies.get(qi)
+            stored = data.hierarchies.get(qi) if qi in data.gen_level else None
+            if hierarchy is not None and stored is not None:
+                if hierarchy is stored or hierarchy.fingerprint == stored.fingerprint:
+                    self.gen_level[qi] = data.gen_level[qi]
+                    self._codes[qi] = codes
+                    continue
+
+            level = None
+            if hierarchy is not None:
+                # Only the values present are looked up
+                used = np.bincount(codes, minlength=len(labels)) > 0
+                level = hierarchy.level_of(labels[used])
+            if level is None:
+                self._labels[qi] = labels
+                self._codes[qi] = codes
+            else:
+                remap = np.zeros(len(labels), dtype=np.int32)
+                remap[used] = hierarchy.encode(labels[used], level)
+                self.gen_level[qi] = level
+                self._codes[qi] = remap[codes]
+
+        if self.sens_att is not None:
+            codes, labels = data.columns[self.sens_att]
+            if self.sens_att == data.sens_att:
+                self.sens_codes = np.asarray(codes)
+                self.sens_values = labels
+            else:
+                self._encode_sens_att(labels[codes])
+
+    def _codes_fingerprint(self) -> str:
+        """Get the fingerprint of the data from its codes, as encoded.
+
+        :return: hash of the codes of the QI and SA and the values of the
+            codes.
+        :rtype: string
+        """
+        columns = [
+            (qi, self._codes[qi], self.gen_level.get(qi, self._labels.get(qi)))
+            for qi in self.quasi_ident
+        ]
+        if self.sens_att is not None:
+            columns.append((self.sens_att, self.sens_codes, self.sens_values))
+        return fingerprint(columns)
+
+    def _encode_sens_att(self, values: np.ndarray) -> None:
+        """Encode the values of the sensitive attribute.
+
+        :param values: values of the sensitive attribute.
+        :type values: numpy array
+        """
+        if isinstance(values, pd.Categorical) and not (values.codes < 0).any():
+            # Only the categories present are sorted
+            categories = np.asarray(values.categories)
+            used = np.flatnonzero(np.bincount(values.codes, minlength=len(categories)))
+            cat_codes = np.full(len(categories), -1, dtype=np.int32)
+            cat_codes[used], self.sens_values = pd.factorize(
+                categories[used], sort=True
+            )
+            self.sens_codes = cat_codes[values.codes]
+            return
+        codes, self.sens_values = pd.factorize(values, sort=True, use_na_sentinel=False)
+        self.sens_codes = codes.astype(np.int32)
+
+    def __len__(self):
+        return len(self.data) if self.rows is None else len(self.rows)
+
+    def labels(self, qi: str) -> np.ndarray:
+        """Get the values that the codes of a quasi-identifier stand for.
+
+        :param qi: name of the quasi-identifier.
+        :type qi: string
+
+        :return: value of each code.
+        :rtype: numpy array
+        """
+        if qi in self.gen_level:
+            return self.hierarchies[qi].labels(self.gen_level[qi])
+        return self._labels[qi]
+
+    def codes(self, qi: str) -> np.ndarray:
+        """Get the code of each record for a quasi-identifier.
+
+        :param qi: name of the quasi-identifier.
+        :type qi: string
+
+        :return: code of each record.
+        :rtype: numpy array
+        """
+        if qi in self._pending:
+            self._codes[qi] = self._pending.pop(qi)[self._codes[qi]]
+        return self._codes[qi]
+
+    def generalize(self, qi: str) -> None:
+        """Apply the next level of the hierarchy of a quasi-identifier.
+
+        :param qi: name of the quasi-identifier.
+        :type qi: string
+        """
+        if qi not in self.gen_level:
+            raise ValueError("Error, invalid hierarchy level")
+        level = self.gen_level[qi] + 1
+        parent = self.hierarchies[qi].parent_map(level - 1, level)
+        if qi in self._pending:
+            self._pending[qi] = parent[self._pending[qi]]
+        else:
+            self._pending[qi] = parent
+        self.gen_level[qi] = level
+        if qi == self.sens_att:
+            self._encode_sens_att(self.labels(qi)[self.codes(qi)])
+        if self._classes is not None:
+            key = self._cache_key()
+            classes = class_stats_cache.get(key) if key is not None else None
+            if classes is None:
+                classes = self._classes.merge(qi, parent)
+                if qi == self.sens_att:
+                    classes.sens_hist = None
+                if key is not None:
+                    class_stats_cache.put(key, classes)
+            self._classes = classes
+
+    def generalize_greedy(self, quasi_ident_gen: list) -> None:
+        """Generalize the quasi-identifier with the most different values.
+
+        The QI that cannot be generalized any further are removed from the
+        candidates given.
+
+        :param quasi_ident_gen: quasi-identifiers that can be generalized.
+        :type quasi_ident_gen: list of strings
+        """
+        qi_gen = quasi_ident_gen[
+            np.argmax([self.n_distinct(qi) for qi in quasi_ident_gen])
+        ]
+        try:
+            self.generalize(qi_gen)
+        except ValueError:
+            quasi_ident_gen.remove(qi_gen)
+
+    def n_distinct(self, qi: str) -> int:
+        """Get the number of different values of a quasi-identifier.
+
+        :param qi: name of the quasi-identifier.
+        :type qi: string
+
+        :return: number of different values.
+        :rtype: int
+        """
+        if self._classes is not None:
+            return self._classes.n_distinct(qi)
+        counts = np.bincount(self.codes(qi), minlength=len(self.labels(qi)))
+        return int(np.count_nonzero(counts))
+
+    def equiv_classes(self) -> EquivalenceClasses:
+        """Find the equivalence classes present in the data.
+
+        The classes are grouped once (or rolled up from the classes of a
+        finer transformation of the data in the cache), and then merged each
+        time a quasi-identifier is generalized.
+
+        :return: equivalence classes.
+        :rtype: EquivalenceClasses
+        """
+        if self._classes is None:
+            key = self._cache_key()
+            if key is not None:
+                self._classes = class_stats_cache.get(key)
+            if self._classes is None and key is not None:
+                finer = class_stats_cache.finer(key)
+                if finer is not None:
+                    self._classes = self._roll_up_from(*finer, self.gen_level)
+                    class_stats_cache.put(key, self._classes)
+        if self._classes is None:
+            self._classes = EquivalenceClasses(
+                {qi: self.codes(qi) for qi in self.quasi_ident},
+                {qi: len(self.labels(qi)) for qi in self.quasi_ident},
+            )
+            if key is not None:
+                class_stats_cache.put(key, self._classes)
+        return self._classes
+
+    def roll_up(self, gen_level: dict) -> EquivalenceClasses:
+        """Get the equivalence classes of a more general transformation.
+
+        The classes are obtained from those of the finest transformation of
+        the data in the cache (or the current one) by means of the parent
+        maps of the hierarchies, without using the records and without
+        modifying the table.
+
+        :param gen_level: level of generalization of each QI, greater or equal
+            than the current one.
+        :type gen_level: dict
+
+        :return: equivalence classes of the transformation.
+        :rtype: EquivalenceClasses
+        """
+        for qi, level in gen_level.items():
+            if qi not in self.gen_level:
+                raise ValueError("Error, invalid hierarchy level")
+            if not self.gen_level[qi] <= level <= self.hierarchies[qi].max_level:
+                raise ValueError("Error, invalid hierarchy level")
+        gen_level = {**self.gen_level, **gen_level}
+        if gen_level == self.gen_level:
+            return self.equiv_classes()
+
+        key = self._cache_key(gen_level)
+        classes = class_stats_cache.get(key) if key is not None else None
+        if classes is None:
+            finer = class_stats_cache.finer(key) if key is not None else None
+            if finer is None:
+                levels = tuple(self.gen_level.get(qi) for qi in self.quasi_ident)
+                finer = (levels, self.equiv_classes())
+            classes = self._roll_up_from(*finer, gen_level)
+            if key is not None:
+                class_stats_cache.put(key, classes)
+        return classes
+
+    def _roll_up_from(
+        self, levels: tuple, classes: EquivalenceClasses, gen_level: dict
+    ) -> EquivalenceClasses:
+        """Roll up the classes of a finer transformation.
+
+        :param levels: level of each QI of the finer transformation.
+        :type levels: tuple
+
+        :param classes: equivalence classes of the finer transformation.
+        :type classes: EquivalenceClasses
+
+        :param gen_level: level of generalization of each QI.
+        :type gen_level: dict
+
+        :return: equivalence classes of the transformation.
+        :rtype: EquivalenceClasses
+        """
+        parents = {
+            qi: self.hierarchies[qi].parent_map(actual, gen_level[qi])
+            for qi, actual in zip(self.quasi_ident, levels)
+            if actual is not None and actual != gen_level[qi]
+        }
+        classes = classes.roll_up(parents)
+        if self.sens_att in parents:
+            classes.sens_hist = None
+        return classes
+
+    def sens_hist(self) -> np.ndarray:
+        """Get the histogram of the sensitive attribute of each class.
+
+        :return: number of records of each equivalence class (rows) with each
+            value of the sensitive attribute (columns).
+        :rtype: numpy array
+        """
+        classes = self.equiv_classes()
+        if classes.sens_hist is None:
+            classes.histogram(self.sens_codes, len(self.sens_values))
+            key = self._cache_key()
+            if key is not None:
+                class_stats_cache.put(key, classes)
+        return classes.sens_hist
+
+    def _cache_key(
+        self, gen_level: typing.Optional[dict] = None
+    ) -> typing.Optional[tuple]:
+        """Get the key of a transformation of the data in the cache.
+
+        :param gen_level: level of generalization of each QI, by default the
+            current one.
+        :type gen_level: dict
+
+        :return: fingerprint of the data, quasi-identifiers, sensitive
+            attribute, fingerprint of the hierarchies and level of each QI, or
+            None if some records have been removed or the cache is disabled
+            (or was when the data was encoded).
+        :rtype: tuple
+        """
+        if self.rows is not None or class_stats_cache.max_bytes == 0:
+            return None
+        if self._fingerprint is None:
+            return None
+        return (
+            self._fingerprint,
+            tuple(self.quasi_ident),
+            self.sens_att,
+            tuple(
+                self.hierarchies[qi].fingerprint if qi in self.gen_level else None
+                for qi in self.quasi_ident
+            ),
+            tuple((gen_level or self.gen_level).get(qi) for qi in self.quasi_ident),
+        )
+
+    def take(self, keep: np.ndarray) -> "EncodedTable":
+        """Get the table with a subset of the records.
+
+        :param keep: boolean mask with the records to be kept.
+        :type keep: numpy array
+
+        :return: table with the records kept.
+        :rtype: EncodedTable
+        """
+        table = copy(self)
+        rows = np.flatnonzero(keep)
+        table.rows = rows if self.rows is None else self.rows[rows]
+        table.gen_level = dict(self.gen_level)
+        table._classes = None
+        table._pending = {}
+        table._codes = {qi: self.codes(qi)[rows] for qi in self.quasi_ident}
+        if self.sens_att is not None:
+            # Only the values of the SA of the records kept are coded
+            sens_codes = self.sens_codes[rows]
+            used = np.bincount(sens_codes, minlength=len(self.sens_values)) > 0
+            table.sens_values = self.sens_values[used]
+            table.sens_codes = (np.cumsum(used) - 1).astype(np.int32)[sens_codes]
+        return table
+
+    def suppress(self, keep: np.ndarray) -> "EncodedTable":
+        """Get the table with the records of some equivalence classes.
+
+        The equivalence classes of the table returned are those kept, so
+        they are not grouped again from the records.
+
+        :param keep: boolean mask with the equivalence classes to be kept.
+        :type keep: numpy array
+
+        :return: table with the records of the classes kept.
+        :rtype: EncodedTable
+        """
+        classes = self.equiv_classes()
+        table = self.take(keep[classes.row_class()])
+        table._classes = classes.subset(keep)
+        return table
+
+    def frame(self) -> pd.DataFrame:
+        """Get the codes of the quasi-identifiers as a dataframe.
+
+        The sensitive attribute, if any, is included with its values.
+
+        :return: dataframe with the codes of the QI.
+        :rtype: pandas dataframe
+        """
+        frame = pd.DataFrame({qi: self.codes(qi) for qi in self.quasi_ident})
+        if self.sens_att is not None:
+            frame[self.sens_att] = self.sens_values[self.sens_codes]
+        return frame
+
+    def decode(self) -> pd.DataFrame:
+        """Get the data with the generalization applied.
+
+        If no record has been removed, the columns of the QI generalized are
+        replaced in a shallow copy of the dataframe given (which is not
+        modified), otherwise a new dataframe with the records kept is built
+        once, with a new index. The data given already encoded is decoded as
+        categorical columns.
+
+        :return: generalized data.
+        :rtype: pandas dataframe
+        """
+        if isinstance(self.data, EncodedData):
+            data = {}
+            for col, (codes, labels) in self.data.columns.items():
+                if col in self.quasi_ident:
+                    data[col] = self._decode(col)
+                else:
+                    rows = slice(None) if self.rows is None else self.rows
+                    data[col] = _column(codes[rows], labels)
+            return pd.DataFrame(data)
+        if self.rows is None:
+            # Only the columns replaced are new, the rest are shared
+            data = self.data.copy(deep=False)
+        else:
+            data = self.data.iloc[self.rows].reset_index(drop=True)
+        for qi in self.quasi_ident:
+            if self.gen_level.get(qi) != self._initial_level.get(qi):
+                data[qi] = self._decode(qi)
+        return data
+
+    def _decode(self, qi: str) -> typing.Union[np.ndarray, pd.Categorical]:
+        """Get the values of a quasi-identifier from its codes.
+
+        :param qi: name of the quasi-identifier.
+        :type qi: string
+
+        :return: value of each record, categorical if the QI was given as a
+            categorical column.
+        :rtype: numpy array, pandas categorical
+        """
+        codes = self.codes(qi)
+        labels = self.labels(qi)
+        if qi not in self._categorical or pd.isna(labels).any():
+            return labels[codes]
+        # Only the labels present are kept as categories
+        used = np.bincount(codes, minlength=len(labels)) > 0
+        remap = np.cumsum(used) - 1
+        return pd.Categorical.from_codes(remap[codes], categories=labels[used])
+
+
+class EncodedData:
+    """Integer-coded columns of the data under study, storable on disk.
+
+    Each column (the quasi-identifiers and, optionally, the sensitive
+    attribute) is kept as the code of each record and the value of each
+    code, along with the hierarchies of the QI. They are stored as ``.npy``
+    files, so the codes can be memory-mapped by several jobs sharing the same
+    data instead of each one parsing and encoding it. It can be given to the
+    anonymization functions instead of a dataframe (with no identifiers):
+    the codes are used as they are, without building a dataframe, so the
+    jobs share the memory-mapped codes as long as they are given the
+    hierarchies stored (or equal ones). The anonymized data has categorical
+    columns.
+
+    :param columns: code of each record and value of each code of each column.
+    :type columns: dictionary with a tuple of two numpy arrays for column
+
+    :param hierarchies: hierarchies for generalizing the QI.
+    :type hierarchies: HierarchySet
+
+    :param gen_level: level of the hierarchy of each QI whose codes are the
+        codes of the values of that level in the hierarchy.
+    :type gen_level: dict
+
+    :param sens_att: name of the sensitive attribute, if its column is coded
+        as the position of each value among the sorted values.
+    :type sens_att: string
+    """
+
+    @beartype()
+    def __init__(
+        self,
+        columns: dict,
+        hierarchies: HierarchySet,
+        gen_level: typing.Optional[dict] = None,
+        sens_att: typing.Optional[str] = None,
+    ):
+        self.columns = columns
+        self.hierarchies = hierarchies
+        self.gen_level = {} if gen_level is None else gen_level
+        self.sens_att = sens_att
+        self._fingerprint = None
+
+    def __len__(self):
+        if len(self.columns) == 0:
+            return 0
+        codes, _ = next(iter(self.columns.values()))
+        return len(codes)
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the codes and the values of the codes of all the columns."""
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint(
+                [(col, codes, labels) for col, (codes, labels) in self.columns.items()]
+            )
+        return self._fingerprint
+
+    @classmethod
+    def encode(
+        cls,
+        data: pd.DataFrame,
+        quasi_ident: typing.Union[typing.List, np.ndarray],
+        hierarchies: dict,
+        sens_att: typing.Optional[str] = None,
+    ) -> "EncodedData":
+        """Encode the quasi-identifiers and sensitive attribute of some data.
+
+        :param data: data under study.
+        :type data: pandas dataframe
+
+        :param quasi_ident: list with the name of the columns of the dataframe
+            that are quasi-identifiers.
+        :type quasi_ident: list of strings
+
+        :param hierarchies: hierarchies for generalizing the QI.
+        :type hierarchies: dictionary containing one dictionary for QI
+            with the hierarchies and the levels
+
+        :param sens_att: string with the name of the sensitive attribute.
+        :type sens_att: string
+
+        :return: integer-coded data.
+        :rtype: EncodedData
+        """
+        hierarchies = HierarchySet(hierarchies)
+        table = EncodedTable(data, quasi_ident, hierarchies, sens_att)
+        columns = {qi: (table.codes(qi), table.labels(qi)) for qi in quasi_ident}
+        if sens_att is not None and sens_att not in columns:
+            columns[sens_att] = (table.sens_codes, np.asarray(table.sens_values))
+        else:
+            sens_att = None
+        return cls(columns, hierarchies, table.gen_level, sens_att)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get the data as a dataframe with a categorical column for column.
+
+        The categorical columns are built from a copy of the codes, so the
+        values are not built. Columns with missing values are decoded. The
+        anonymization functions do not need it, since they take the codes.
+
+        :return: data under study.
+        :rtype: pandas dataframe
+        """
+        return pd.DataFrame(
+            {
+                col: _column(codes, labels)
+                for col, (codes, labels) in self.columns.items()
+            }
+        )
+
+    def save(self, path: typing.Union[str, os.PathLike]) -> None:
+        """Store the data and hierarchies in a directory of ``.npy`` files.
+
+        :param path: directory where the data is stored.
+        :type path: string
+        """
+        os.makedirs(path, exist_ok=True)
+        self.hierarchies.save(os.path.join(path, "hierarchies"))
+        for i, (codes, labels) in enumerate(self.columns.values()):
+            np.save(os.path.join(path, f"{i}.codes.npy"), codes)
+            np.save(os.path.join(path, f"{i}.labels.npy"), _storable(labels))
+        with open(os.path.join(path, "data.json"), "w") as f:
+            json.dump(
+                {
+                    "columns": list(self.columns),
+                    "gen_level": self.gen_level,
+                    "sens_att": self.sens_att,
+                    "fingerprint": self.fingerprint,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path: typing.Union[str, os.PathLike],
+        mmap_mode: typing.Optional[str] = "r",
+    ) -> "EncodedData":
+        """Load the data and hierarchies stored with ``save``.
+
+        :param path: directory where the data is stored.
+        :type path: string
+
+        :param mmap_mode: mode for memory-mapping the codes, as in
+            ``numpy.load``, or None for reading them.
+        :type mmap_mode: string
+
+        :return: integer-coded data.
+        :rtype: EncodedData
+        """
+        with open(os.path.join(path, "data.json")) as f:
+            meta = json.load(f)
+        columns = {
+            col: (
+                np.load(os.path.join(path, f"{i}.codes.npy"), mmap_mode=mmap_mode),
+                _restored(np.load(os.path.join(path, f"{i}.labels.npy"))),
+            )
+            for i, col in enumerate(meta["columns"])
+        }
+        hierarchies = HierarchySet.load(os.path.join(path, "hierarchies"), mmap_mode)
+        encoded = cls(columns, hierarchies, meta.get("gen_level"), meta.get("sens_att"))
+        # The codes are not hashed again by each job
+        encoded._fingerprint = meta.get("fingerprint")
+        return encoded
+
+
+def encode_table(
+    data: typing.Union[pd.DataFrame, EncodedData],
+    ident: typing.Union[typing.List, np.ndarray],
+    quasi_ident: typing.Union[typing.List, np.ndarray],
+    hierarchies: dict,
+    sens_att: typing.Optional[str] = None,
+) -> EncodedTable:
+    """Encode the data under study, with the identifiers suppressed.
+
+    Data already encoded has no identifiers, and its codes are used as they
+    are.
+
+    :param data: data under study.
+    :type data: pandas dataframe or EncodedData
+
+    :param ident: list with the name of the columns of the dataframe
+        that are identifiers.
+    :type ident: list of strings
+
+    :param quasi_ident: list with the name of the columns of the dataframe
+        that are quasi-identifiers.
+    :type quasi_ident: list of strings
+
+    :param hierarchies: hierarchies for generalizing the QI.
+    :type hierarchies: dictionary containing one dictionary for QI
+        with the hierarchies and the levels
+
+    :param sens_att: string with the name of the sensitive attribute.
+    :type sens_att: string
+
+    :return: integer-coded data.
+    :rtype: EncodedTable
+    """
+    hierarchies = compile_hierarchies(hierarchies)
+    if isinstance(data, EncodedData):
+        if len(ident) > 0:
+            raise ValueError(f"Identifiers {list(ident)} are not in the encoded data")
+    else:
+        # The columns are only replaced, so their values are not copied
+        data = suppress_identifiers(data, ident, inplace=False)
+    return EncodedTable(data, quasi_ident, hierarchies, sens_att)
+
+
+def _column(
+    codes: np.ndarray, labels: np.ndarray
+) -> typing.Union[np.ndarray, pd.Categorical]:
+    """Get the values of a column from its codes.
+
+    :param codes: code of each record.
+    :type codes: numpy array
+
+    :param labels: value of each code.
+    :type labels: numpy array
+
+    :return: categorical column, or the values if some of them are missing.
+    :rtype: numpy array, pandas categorical
+    """
+    if pd.isna(labels).any():
+        return labels[codes]
+    return pd.Categorical.from_codes(codes, categories=labels, validate=False)
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Module with the equivalence classes of the integer-coded data."""
+
+import weakref
+
+import numpy as np
+import pandas as pd
+from beartype import beartype
+from beartype import typing
+from copy import copy
+
+
+@beartype()
+def group_codes(codes: typing.List[np.ndarray], cards: typing.List[int]) -> np.ndarray:
+    """Group the positions sharing the same combination of codes.
+
+    :param codes: codes of each column, all of them with the same length.
+    :type codes: list of numpy arrays
+
+    :param cards: number of different codes of each column.
+    :type cards: list of int
+
+    :return: group of each position, numbered in order of appearance.
+    :rtype: numpy array
+    """
+    n = len(codes[0]) if len(codes) > 0 else 0
+    key = np.zeros(n, dtype=np.int64)
+    radix = 1
+    for column, card in zip(codes, cards):
+        if radix * card >= 2**62:
+            key, _ = pd.factorize(key)
+            radix = int(key.max()) + 1
+        key = key + column.astype(np.int64) * radix
+        radix = radix * card
+    group, _ = pd.factorize(key)
+    return group
+
+
+def _first_positions(group: np.ndarray) -> np.ndarray:
+    """Get the position where each group appears for the first time.
+
+    :param group: group of each position, numbered in order of appearance.
+    :type group: numpy array
+
+    :return: first position of each group.
+    :rtype: numpy array
+    """
+    if len(group) == 0:
+        return np.array([], dtype=np.int64)
+    new = np.empty(len(group), dtype=bool)
+    new[0] = True
+    new[1:] = group[1:] > np.maximum.accumulate(group)[:-1]
+    return np.flatnonzero(new)
+
+
+class EquivalenceClasses:
+    """Equivalence classes of the integer-coded data.
+
+    Each class is stored as its key (the code of each quasi-identifier) and
+    its size, and optionally its histogram of the sensitive attribute. When a
+    quasi-identifier is generalized, classes can only merge, so the new
+    classes are obtained by grouping the keys of the current ones instead of
+    all the records, and their histograms by adding those of the classes
+    merged.
+
+    :param codes: codes of each quasi-identifier.
+    :type codes: dictionary with one numpy array for QI
+
+    :param cards: number of different codes of each quasi-identifier.
+    :type cards: dictionary with one int for QI
+    """
+
+    def __init__(self, codes: dict, cards: dict):
+        self.quasi_ident = list(codes.keys())
+        self.cards = dict(cards)
+        row_class = group_codes(
+            [codes[qi] for qi in self.quasi_ident],
+            [self.cards[qi] for qi in self.quasi_ident],
+        )
+        first = _first_positions(row_class)
+        self.keys = {qi: codes[qi][first] for qi in self.quasi_ident}
+        self.counts = np.bincount(row_class, minlength=len(first))
+        self.sens_hist = None
+        self._row_class = row_class
+        self._remap = None
+        self._parent = None
+        self._step = None
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays of the equivalence classes.
+
+        The class of each record is counted in full even while it is shared
+        with the classes they were merged from, since it is built when
+        needed, along with the mapping to be applied meanwhile.
+        """
+        arrays = list(self.keys.values()) + [self.counts, self._row_class]
+        if self._remap is not None:
+            arrays.append(self._remap)
+        if self.sens_hist is not None:
+            arrays.append(self.sens_hist)
+        return sum(array.nbytes for array in arrays)
+
+    def freeze(self) -> None:
+        """Make the arrays of the equivalence classes read-only.
+
+        The classes can still be completed (with their histograms or the
+        class of each record), but their arrays cannot be modified in place.
+        """
+        arrays = list(self.keys.values()) + [self.counts, self._row_class]
+        for array in arrays + [self._remap, self.sens_hist]:
+            if array is not None:
+                array.setflags(write=False)
+
+    @property
+    def k(self) -> int:
+        """Size of the smallest equivalence class."""
+        return int(min(self.counts))
+
+    def n_distinct(self, qi: str) -> int:
+        """Get the number of different values of a quasi-identifier.
+
+        :param qi: name of the quasi-identifier.
+        :type qi: string
+
+        :return: number of different values.
+        :rtype: int
+        """
+        return len(np.unique(self.keys[qi]))
+
+    def row_class(self) -> np.ndarray:
+        """Get the equivalence class of each record.
+
+        :return: equivalence class of each record.
+        :rtype: numpy array
+        """
+        if self._remap is not None:
+            self._row_class = self._remap[self._row_class]
+            self._remap = None
+        return self._row_class
+
+    def merged_from(self, classes: "EquivalenceClasses") -> typing.Optional[np.ndarray]:
+        """Get how some equivalence classes were merged into these ones.
+
+        :param classes: equivalence classes these ones may come from.
+        :type classes: EquivalenceClasses
+
+        :return: class into which each of the given classes was merged, or
+            None if these classes were not obtained from them.
+        :rtype: numpy array
+        """
+        if self._parent is not None and self._parent() is classes:
+            return self._step
+        return None
+
+    def histogram(self, sens_codes: np.ndarray, n_values: int) -> np.ndarray:
+        """Get the histogram of the sensitive attribute of each class.
+
+        It is computed the first time it is needed, and kept when the
+        classes are merged.
+
+        :param sens_codes: code of the sensitive attribute of each record.
+        :type sens_codes: numpy array
+
+        :param n_values: number of different codes of the sensitive attribute.
+        :type n_values: int
+
+        :return: number of records of each class (rows) with each value of
+            the sensitive attribute (columns).
+        :rtype: numpy array
+        """
+        if self.sens_hist is None:
+            cells = self.row_class().astype(np.int64) * n_values + sens_codes
+            self.sens_hist = np.bincount(cells, minlength=len(self) * n_values).reshape(
+                len(self), n_values
+            )
+        return self.sens_hist
+
+    def merge(self, qi: str, parent: np.ndarray) -> "EquivalenceClasses":
+        """Get the equivalence classes after generalizing a quasi-identifier.
+
+        :param qi: name of the quasi-identifier generalized.
+        :type qi: string
+
+        :param parent: new code of each of the current codes of the QI.
+        :type parent: numpy array
+
+        :return: equivalence classes with the QI generalized.
+        :rtype: EquivalenceClasses
+        """
+        return self.roll_up({qi: parent})
+
+    def roll_up(self, parents: dict) -> "EquivalenceClasses":
+        """Get the equivalence classes after generalizing several QI at once.
+
+        The keys of the classes are mapped to the new codes and grouped, and
+        the sizes and histograms of the classes merged are added, so the
+        records are not used.
+
+        :param parents: new code of each of the current codes, for each
+            quasi-identifier generalized.
+        :type parents: dictionary with one numpy array for QI
+
+        :return: equivalence classes with the QI generalized.
+        :rtype: EquivalenceClasses
+        """
+        keys = dict(self.keys)
+        cards = dict(self.cards)
+        for qi, parent in parents.items():
+            keys[qi] = parent[keys[qi]]
+            cards[qi] = int(parent.max()) + 1 if len(parent) > 0 else 0
+
+        remap = group_codes(
+            [keys[q] for q in self.quasi_ident], [cards[q] for q in self.quasi_ident]
+        )
+        first = _first_positions(remap)
+
+        classes = copy(self)
+        classes.cards = cards
+        classes.keys = {q: keys[q][first] for q in self.quasi_ident}
+        classes.counts = np.bincount(
+            remap, weights=self.counts, minlength=len(first)
+        ).astype(np.int64)
+        classes._remap = remap if self._remap is None else remap[self._remap]
+        classes._parent = weakref.ref(self)
+        classes._step = remap
+        if self.sens_hist is not None and len(first) > 0:
+            order = np.argsort(remap, kind="stable")
+            starts = np.searchsorted(remap[order], np.arange(len(first)))
+            classes.sens_hist = np.add.reduceat(self.sens_hist[order], starts, axis=0)
+        return classes
+
+    def subset(self, keep: np.ndarray) -> "EquivalenceClasses":
+        """Get the equivalence classes after suppressing some of them.
+
+        The classes kept are not modified, so their keys, sizes and
+        histograms are taken instead of grouping the records kept again. The
+        columns of the histograms of the values of the sensitive attribute
+        only present in the classes suppressed are removed.
+
+        :param keep: boolean mask with the classes to be kept.
+        :type keep: numpy array
+
+        :return: equivalence classes kept, numbered in the same order.
+        :rtype: EquivalenceClasses
+        """
+        row_class = self.row_class()
+        new_class = (np.cumsum(keep) - 1).astype(row_class.dtype)
+
+        classes = copy(self)
+        classes.keys = {qi: key[keep] for qi, key in self.keys.items()}
+        classes.counts = self.counts[keep]
+        classes._row_class = new_class[row_class[keep[row_class]]]
+        classes._remap = None
+        classes._parent = None
+        classes._step = None
+        if self.sens_hist is not None:
+            sens_hist = self.sens_hist[keep]
+            classes.sens_hist = sens_hist[:, sens_hist.sum(axis=0) > 0]
+        return classes
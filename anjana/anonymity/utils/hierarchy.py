@@ -0,0 +1,786 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Module with the compiled representation of the hierarchies."""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+from beartype import beartype
+from beartype import typing
+
+
+class Hierarchy(Mapping):
+    """Compiled hierarchy for generalizing a quasi-identifier.
+
+    It behaves as the dictionary with the levels of the hierarchy it is built
+    from, but each level is indexed the first time it is used, so a whole
+    column can be generalized with a single vectorized lookup. Categorical
+    columns are generalized by looking up their categories only.
+
+    :param hierarchy: hierarchy for generalizing a given QI.
+    :type hierarchy: dictionary with the hierarchies and the levels
+    """
+
+    @beartype()
+    def __init__(self, hierarchy: typing.Union[dict, "Hierarchy"]):
+        self._levels = {
+            level: np.asarray(pd.Series(values).values)
+            for level, values in hierarchy.items()
+        }
+        self._index = {}
+        self._parent_maps = {}
+        self._level_index = None
+        self._fingerprint = None
+        self._valid = False
+
+    def __getitem__(self, level):
+        return self._levels[level]
+
+    def __iter__(self):
+        return iter(self._levels)
+
+    def __len__(self):
+        return len(self._levels)
+
+    @property
+    def max_level(self) -> int:
+        """Highest level of the hierarchy."""
+        return len(self._levels) - 1
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the values of all the levels of the hierarchy."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for level, values in self._levels.items():
+                digest.update(repr(level).encode())
+                digest.update(pd.util.hash_array(values).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def from_csv(cls, path: typing.Union[str, os.PathLike], **kwargs) -> "Hierarchy":
+        """Load a hierarchy from a CSV file, with a column for each level.
+
+        :param path: path of the CSV file, without header.
+        :type path: string
+
+        :param kwargs: other arguments for ``pandas.read_csv``.
+
+        :return: validated hierarchy.
+        :rtype: Hierarchy
+        """
+        data = pd.read_csv(path, header=None, **kwargs)
+        hierarchy = cls({i: data.iloc[:, i].values for i in range(data.shape[1])})
+        hierarchy.validate()
+        return hierarchy
+
+    @classmethod
+    def from_parquet(
+        cls, path: typing.Union[str, os.PathLike], **kwargs
+    ) -> "Hierarchy":
+        """Load a hierarchy from a Parquet file, with a column for each level.
+
+        The levels are taken in the order of the columns. Reading Parquet
+        files requires pyarrow or fastparquet.
+
+        :param path: path of the Parquet file.
+        :type path: string
+
+        :param kwargs: other arguments for ``pandas.read_parquet``.
+
+        :return: validated hierarchy.
+        :rtype: Hierarchy
+        """
+        data = pd.read_parquet(path, **kwargs)
+        hierarchy = cls({i: data.iloc[:, i].values for i in range(data.shape[1])})
+        hierarchy.validate()
+        return hierarchy
+
+    def validate(self) -> None:
+        """Check that each level of the hierarchy is a function of the previous.
+
+        All the levels must have the same number of rows, and the rows with
+        the same value in a level must have the same value in the next one.
+        """
+        if self._valid:
+            return
+        if list(self._levels) != list(range(len(self._levels))):
+            raise ValueError("Error, the levels of the hierarchy must be 0, 1, ...")
+        if len({len(values) for values in self._levels.values()}) > 1:
+            raise ValueError("Error, the levels of the hierarchy have different sizes")
+        for level in range(1, len(self._levels)):
+            _, _, prev = self._compile(level - 1)
+            _, _, codes = self._compile(level)
+            if (self.parent_map(level - 1, level)[prev] != codes).any():
+                raise ValueError(
+                    f"Error, level {level} of the hierarchy is not a function "
+                    f"of level {level - 1}"
+                )
+        self._valid = True
+
+    def save(self, path: typing.Union[str, os.PathLike]) -> None:
+        """Store the compiled hierarchy in a directory of ``.npy`` files.
+
+        The different values of each level, the code of each row and the
+        code in each level of the codes of the previous one are stored, so
+        the hierarchy is loaded without indexing it again.
+
+        :param path: directory where the hierarchy is stored.
+        :type path: string
+        """
+        self.validate()
+        os.makedirs(path, exist_ok=True)
+        for level in self._levels:
+            uniques, first_row, codes = self._compile(level)
+            np.save(os.path.join(path, f"{level}.labels.npy"), _storable(uniques))
+            np.save(os.path.join(path, f"{level}.first_row.npy"), first_row)
+            np.save(os.path.join(path, f"{level}.codes.npy"), codes)
+            if level > 0:
+                parent = self.parent_map(level - 1, level)
+                np.save(os.path.join(path, f"{level}.parent.npy"), parent)
+        with open(os.path.join(path, "hierarchy.json"), "w") as f:
+            json.dump({"levels": len(self._levels)}, f)
+
+    @classmethod
+    def load(
+        cls,
+        path: typing.Union[str, os.PathLike],
+        mmap_mode: typing.Optional[str] = None,
+    ) -> "Hierarchy":
+        """Load a hierarchy stored with ``save``.
+
+        :param path: directory where the hierarchy is stored.
+        :type path: string
+
+        :param mmap_mode: mode for memory-mapping the codes, as in
+            ``numpy.load``, or None for reading them.
+        :type mmap_mode: string
+
+        :return: compiled hierarchy.
+        :rtype: Hierarchy
+        """
+        with open(os.path.join(path, "hierarchy.json")) as f:
+            n_levels = json.load(f)["levels"]
+
+        def read(name):
+            return np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+
+        hierarchy = cls({})
+        for level in range(n_levels):
+            labels = _restored(read(f"{level}.labels.npy"))
+            codes = read(f"{level}.codes.npy")
+            hierarchy._levels[level] = labels[codes]
+            hierarchy._index[level] = (
+                pd.Index(labels),
+                read(f"{level}.first_row.npy"),
+                codes,
+            )
+            if level > 0:
+                hierarchy._parent_maps[level - 1, level] = read(f"{level}.parent.npy")
+        hierarchy._valid = True
+        return hierarchy
+
+    def _compile(self, level: int) -> typing.Tuple[pd.Index, np.ndarray, np.ndarray]:
+        """Index the values of a level of the hierarchy.
+
+        :param level: level of the hierarchy to be indexed.
+        :type level: int
+
+        :return: unique values of the level, position of the first row of
+            the hierarchy where each of them appears and code of the value
+            of each row of the hierarchy.
+        :rtype: pandas index, numpy array and numpy array
+        """
+        if level not in self._index:
+            codes, uniques = pd.factorize(self._levels[level], use_na_sentinel=False)
+            _, first_row = np.unique(codes, return_index=True)
+            self._index[level] = (pd.Index(uniques), first_row, codes.astype(np.int32))
+        return self._index[level]
+
+    def labels(self, level: int) -> np.ndarray:
+        """Get the different values of a level of the hierarchy.
+
+        The position of each value is the integer code used to encode it.
+
+        :param level: level of the hierarchy.
+        :type level: int
+
+        :return: values of the level, without repetitions.
+        :rtype: numpy array
+        """
+        uniques, _, _ = self._compile(level)
+        return uniques.values
+
+    def encode(
+        self,
+        values: typing.Union[typing.List, np.ndarray, pd.Categorical],
+        level: int,
+    ) -> np.ndarray:
+        """Get the integer codes of some values of a level of the hierarchy.
+
+        :param values: values of the quasi-identifier.
+        :type values: list, numpy array, pandas categorical
+
+        :param level: level of the hierarchy the values belong to.
+        :type level: int
+
+        :return: code of each value.
+        :rtype: numpy array
+        """
+        uniques, _, _ = self._compile(level)
+        if isinstance(values, pd.Categorical) and not (values.codes < 0).any():
+            # Only the categories are looked up
+            codes = uniques.get_indexer(values.categories)[values.codes]
+        else:
+            codes = uniques.get_indexer(values)
+        if (codes < 0).any():
+            raise ValueError(f"Error, values not found in the hierarchy level {level}")
+        return codes.astype(np.int32)
+
+    def lookup(
+        self,
+        values: typing.Union[typing.List, np.ndarray, pd.Categorical],
+        level: int,
+    ) -> np.ndarray:
+        """Get the rows of the hierarchy where the given values appear.
+
+        :param values: values of the quasi-identifier.
+        :type values: list, numpy array, pandas categorical
+
+        :param level: level of the hierarchy the values belong to.
+        :type level: int
+
+        :return: position of the first row of the hierarchy containing each value.
+        :rtype: numpy array
+        """
+        _, first_row, _ = self._compile(level)
+        return first_row[self.encode(values, level)]
+
+    def level_of(
+        self, values: typing.Union[typing.List, np.ndarray, pd.Categorical]
+    ) -> typing.Optional[int]:
+        """Get the lowest level of the hierarchy containing all the given values.
+
+        The different values given are looked up in an index with the levels
+        where each value of the hierarchy appears, built the first time it is
+        needed. Only the categories present are looked up for categorical
+        values.
+
+        :param values: values of the quasi-identifier.
+        :type values: list, numpy array, pandas categorical
+
+        :return: lowest level containing the values, or None if no level
+            contains all of them.
+        :rtype: int
+        """
+        if self._level_index is None:
+            levels = list(self._levels)
+            labels = [self.labels(level) for level in levels]
+            codes, uniques = pd.factorize(
+                np.concatenate([np.asarray(lab, dtype=object) for lab in labels]),
+                use_na_sentinel=False,
+            )
+            level_pos = np.repeat(np.arange(len(levels)), [len(lab) for lab in labels])
+            in_level = np.zeros((len(uniques), len(levels)), dtype=bool)
+            in_level[codes, level_pos] = True
+            self._level_index = (pd.Index(uniques), in_level, levels)
+        uniques, in_level, levels = self._level_index
+
+        if isinstance(values, pd.Categorical):
+            # Number of missing values and of records with each category
+            counts = np.bincount(values.codes + 1, minlength=len(values.categories) + 1)
+            used = np.asarray(values.categories)[counts[1:] > 0]
+            values = np.append(used, np.nan) if counts[0] > 0 else used
+        values = np.asarray(values)
+        # Hashing the strings with a set is faster than with pandas
+        distinct = list(set(values)) if values.dtype == object else pd.unique(values)
+        pos = uniques.get_indexer(distinct)
+        if (pos < 0).any():
+            return None
+        containing = np.flatnonzero(in_level[pos].all(axis=0))
+        return levels[containing[0]] if len(containing) > 0 else None
+
+    def parent_map(self, actual: int, level: int) -> np.ndarray:
+        """Get the mapping between the codes of two levels of the hierarchy.
+
+        :param actual: current level of the hierarchy applied.
+        :type actual: int
+
+        :param level: level of the hierarchy to be applied.
+        :type level: int
+
+        :return: code in the given level of each code of the current one.
+        :rtype: numpy array
+        """
+        if level > self.max_level:
+            raise ValueError("Error, invalid hierarchy level")
+        if (actual, level) not in self._parent_maps:
+            _, first_row, _ = self._compile(actual)
+            _, _, codes = self._compile(level)
+            self._parent_maps[actual, level] = codes[first_row]
+        return self._parent_maps[actual, level]
+
+    def generalize(
+        self,
+        values: typing.Union[typing.List, np.ndarray, pd.Categorical],
+        level: int,
+        actual: int,
+    ) -> typing.Union[np.ndarray, pd.Categorical]:
+        """Apply certain level of the hierarchy given the current one.
+
+        :param values: values of the quasi-identifier.
+        :type values: list, numpy array, pandas categorical
+
+        :param level: level of the hierarchy to be applied.
+        :type level: int
+
+        :param actual: current level of the hierarchy applied.
+        :type actual: int
+
+        :return: column with the given level of hierarchy applied, categorical
+            if the values given are.
+        :rtype: numpy array, pandas categorical
+        """
+        if level > self.max_level:
+            raise ValueError("Error, invalid hierarchy level")
+        if isinstance(values, pd.Categorical):
+            return self._generalize_categorical(values, level, actual)
+        return self._levels[level][self.lookup(values, actual)]
+
+    def _generalize_categorical(
+        self, values: pd.Categorical, level: int, actual: int
+    ) -> pd.Categorical:
+        """Apply certain level of the hierarchy to a categorical column.
+
+        Only the categories are generalized, the records being remapped to
+        the new categories with their codes.
+
+        :param values: values of the quasi-identifier.
+        :type values: pandas categorical
+
+        :param level: level of the hierarchy to be applied.
+        :type level: int
+
+        :param actual: current level of the hierarchy applied.
+        :type actual: int
+
+        :return: column with the given level of hierarchy applied.
+        :rtype: pandas categorical
+        """
+        if (values.codes < 0).any():
+            # Missing values are looked up in the hierarchy as any other
+            return self._levels[level][self.lookup(values, actual)]
+        uniques, _, _ = self._compile(actual)
+        cat_codes = uniques.get_indexer(values.categories)
+        missing = np.flatnonzero(cat_codes < 0)
+        if len(missing) > 0 and np.isin(values.codes, missing).any():
+            raise ValueError(f"Error, values not found in the hierarchy level {actual}")
+
+        labels = self.labels(level)
+        parent = self.parent_map(actual, level)[cat_codes]
+        parent[cat_codes < 0] = -1
+        # Categories of the level reached by the categories given
+        new_codes, used = pd.factorize(parent, sort=True)
+        if len(used) > 0 and used[0] < 0:
+            new_codes, used = new_codes - 1, used[1:]
+        if pd.isna(labels[used]).any():
+            return self._levels[level][self.lookup(values, actual)]
+        return pd.Categorical.from_codes(
+            new_codes.astype(values.codes.dtype)[values.codes],
+            categories=labels[used],
+        )
+
+
+# Hierarchies compiled from dictionaries, by the id of the dictionary
+_compiled = OrderedDict()
+_COMPILED_MAX = 32
+
+
+@beartype()
+def compile_hierarchy(hierarchy: typing.Union[dict, Hierarchy]) -> Hierarchy:
+    """Compile the hierarchy of a quasi-identifier.
+
+    The Hierarchy built from a dictionary is kept while the dictionary and
+    each of its levels are the same objects, so giving the same dictionary
+    again reuses the indexes of the levels instead of building them again.
+    A level modified in place must be given as a new object.
+
+    :param hierarchy: hierarchy for generalizing a given QI.
+    :type hierarchy: dictionary with the hierarchies and the levels, or
+        compiled Hierarchy
+
+    :return: compiled hierarchy.
+    :rtype: Hierarchy
+    """
+    if isinstance(hierarchy, Hierarchy):
+        return hierarchy
+    # The dictionary and its levels are referenced, so their ids are unique
+    levels = list(hierarchy.items())
+    key = [(level, id(values)) for level, values in levels]
+    entry = _compiled.get(id(hierarchy))
+    if entry is not None and entry[1] == key:
+        _compiled.move_to_end(id(hierarchy))
+        return entry[2]
+
+    compiled = Hierarchy(hierarchy)
+    _compiled[id(hierarchy)] = ((hierarchy, levels), key, compiled)
+    _compiled.move_to_end(id(hierarchy))
+    if len(_compiled) > _COMPILED_MAX:
+        _compiled.popitem(last=False)
+    return compiled
+
+
+@beartype()
+def compile_hierarchies(hierarchies: dict) -> dict:
+    """Compile the hierarchies of the quasi-identifiers.
+
+    The hierarchies given are not modified, a Hierarchy being built (or
+    reused, see ``compile_hierarchy``) for those given as dictionaries.
+
+    :param hierarchies: hierarchies for generalizing the QI.
+    :type hierarchies: dictionary containing one dictionary for QI
+        with the hierarchies and the levels
+
+    :return: hierarchies for generalizing the QI.
+    :rtype: dictionary containing one Hierarchy for QI
+    """
+    return {qi: compile_hierarchy(hierarchy) for qi, hierarchy in hierarchies.items()}
+
+
+class HierarchySet(dict):
+    """Compiled and validated hierarchies of the quasi-identifiers.
+
+    It is a dictionary with one Hierarchy for QI, so it can be given wherever
+    the hierarchies are expected. The hierarchies can be loaded from CSV or
+    Parquet files, and stored in a directory of ``.npy`` files from which
+    they are loaded again without parsing nor indexing them.
+
+    :param hierarchies: hierarchies for generalizing the QI.
+    :type hierarchies: dictionary containing one dictionary or Hierarchy
+        for QI with the hierarchies and the levels
+    """
+
+    @beartype()
+    def __init__(self, hierarchies: typing.Optional[dict] = None):
+        super().__init__(
+            compile_hierarchies({} if hierarchies is None else hierarchies)
+        )
+        for hierarchy in self.values():
+            hierarchy.validate()
+
+    @classmethod
+    def from_csv(cls, paths: dict, **kwargs) -> "HierarchySet":
+        """Load the hierarchies from CSV files, with a column for each level.
+
+        :param paths: path of the CSV file, without header, of each QI.
+        :type paths: dictionary with one string for QI
+
+        :param kwargs: other arguments for ``pandas.read_csv``.
+
+        :return: validated hierarchies.
+        :rtype: HierarchySet
+        """
+        return cls(
+            {qi: Hierarchy.from_csv(path, **kwargs) for qi, path in paths.items()}
+        )
+
+    @classmethod
+    def from_parquet(cls, paths: dict, **kwargs) -> "HierarchySet":
+        """Load the hierarchies from Parquet files, with a column for each level.
+
+        :param paths: path of the Parquet file of each QI.
+        :type paths: dictionary with one string for QI
+
+        :param kwargs: other arguments for ``pandas.read_parquet``.
+
+        :return: validated hierarchies.
+        :rtype: HierarchySet
+        """
+        return cls(
+            {qi: Hierarchy.from_parquet(path, **kwargs) for qi, path in paths.items()}
+        )
+
+    def save(self, path: typing.Union[str, os.PathLike]) -> None:
+        """Store the hierarchies in a directory, with a subdirectory for QI.
+
+        :param path: directory where the hierarchies are stored.
+        :type path: string
+        """
+        os.makedirs(path, exist_ok=True)
+        for i, hierarchy in enumerate(self.values()):
+            hierarchy.save(os.path.join(path, str(i)))
+        with open(os.path.join(path, "hierarchies.json"), "w") as f:
+            json.dump({"quasi_ident": list(self.keys())}, f)
+
+    @classmethod
+    def load(
+        cls,
+        path: typing.Union[str, os.PathLike],
+        mmap_mode: typing.Optional[str] = None,
+    ) -> "HierarchySet":
+        """Load the hierarchies stored with ``save``.
+
+        :param path: directory where the hierarchies are stored.
+        :type path: string
+
+        :param mmap_mode: mode for memory-mapping the codes, as in
+            ``numpy.load``, or None for reading them.
+        :type mmap_mode: string
+
+        :return: compiled hierarchies.
+        :rtype: HierarchySet
+        """
+        with open(os.path.join(path, "hierarchies.json")) as f:
+            quasi_ident = json.load(f)["quasi_ident"]
+        hierarchies = cls()
+        for i, qi in enumerate(quasi_ident):
+            hierarchies[qi] = Hierarchy.load(os.path.join(path, str(i)), mmap_mode)
+        return hierarchies
+
+
+def _storable(uniques: typing.Union[pd.Index, np.ndarray]) -> np.ndarray:
+    """Get the different values of a level as an array stored without pickle.
+
+    :param uniques: different values of a level of a hierarchy.
+    :type uniques: pandas index or numpy array
+
+    :return: values as strings or numbers.
+    :rtype: numpy array
+    """
+    values = np.asarray(uniques)
+    if values.dtype != object:
+        return np.asarray(values)
+    kind = pd.api.types.infer_dtype(values, skipna=False)
+    if kind == "string":
+        return values.astype(str)
+    if kind in ("integer", "floating", "mixed-integer-float", "boolean"):
+        return np.array(values.tolist())
+    raise ValueError(f"Error, the values of the hierarchy cannot be stored ({kind})")
+
+
+def _restored(values: np.ndarray) -> np.ndarray:
+    """Get the values of a level stored with ``_storable`` as they were given.
+
+    :param values: values as strings or numbers.
+    :type values: numpy array
+
+    :return: values, the strings as objects.
+    :rtype: numpy array
+    """
+    if values.dtype.kind == "U":
+        return values.astype(object)
+    return values
+
+
+@beartype()
+def numeric_hierarchy(
+    values: typing.Union[typing.List, np.ndarray, pd.Series],
+    method: str = "width",
+    widths: typing.Optional[typing.List[typing.Union[int, float]]] = None,
+    n_bins: typing.Optional[typing.List[int]] = None,
+    inf: typing.Optional[typing.Union[int, float]] = None,
+) -> Hierarchy:
+    """Build a multi-level interval hierarchy for a numeric quasi-identifier.
+
+    The hierarchy has a row for each different value: level 0 has the values,
+    each of the following levels groups the intervals of the previous one,
+    and the last level suppresses the value ("*"). The intervals are labelled
+    as in ``generate_intervals`` (a value on a bound being in the interval
+    below it), only one label being built for each interval. Three methods
+    are available:
+
+    - "width": intervals of each of the widths given, starting from inf.
+      Each width must be a multiple of the previous one.
+    - "power2": intervals starting from inf, of the first width given (1 by
+      default) and doubling it in each level, until a single interval holds
+      all the values.
+    - "quantile": intervals with about the same number of records, as many as
+      given for each level. The bounds of each level are bounds of the
+      previous one, the last interval including the highest value.
+
+    :param values: values of the quasi-identifier.
+    :type values: list, numpy array or pandas series
+
+    :param method: method for building the intervals, "width", "power2" or
+        "quantile".
+    :type method: string
+
+    :param widths: width of the intervals of each level ("width"), or of the
+        first level ("power2").
+    :type widths: list of numbers
+
+    :param n_bins: number of intervals of each level ("quantile"), in
+        decreasing order.
+    :type n_bins: list of int
+
+    :param inf: lower bound of the first interval, by default the lowest
+        value.
+    :type inf: int or float
+
+    :return: compiled hierarchy.
+    :rtype: Hierarchy
+    """
+    uniques, counts = np.unique(np.asarray(values), return_counts=True)
+    if len(uniques) == 0:
+        raise ValueError("Error, no values given for building the hierarchy")
+    low = uniques[0] if inf is None else inf
+    if low > uniques[0]:
+        raise ValueError(f"Error, lower bound {inf} above the lowest value")
+
+    if method == "width":
+        if widths is None or len(widths) == 0:
+            raise ValueError("Error, the widths of the intervals must be given")
+        _check_widths(widths)
+        bounds = [_width_bounds(low, width, uniques[-1]) for width in widths]
+    elif method == "power2":
+        width = 1 if widths is None or len(widths) == 0 else widths[0]
+        _check_widths([width])
+        bounds = [_width_bounds(low, width, uniques[-1])]
+        while len(bounds[-1]) > 2:
+            width = width * 2
+            bounds.append(_width_bounds(low, width, uniques[-1]))
+    elif method == "quantile":
+        if n_bins is None or len(n_bins) == 0:
+            raise ValueError("Error, the number of intervals must be given")
+        if min(n_bins) < 1 or list(n_bins) != sorted(n_bins, reverse=True):
+            raise ValueError(f"Error, invalid number of intervals {n_bins}")
+        bounds = _quantile_bounds(low, uniques, counts, n_bins)
+    else:
+        raise ValueError(f"Invalid method for the hierarchy {method}")
+
+    levels = {0: uniques}
+    for bound in bounds:
+        levels[len(levels)] = _interval_labels(
+            uniques, bound, closed=method == "quantile"
+        )
+    levels[len(levels)] = np.full(len(uniques), "*", dtype=object)
+    return Hierarchy(levels)
+
+
+def _check_widths(widths: typing.List[typing.Union[int, float]]) -> None:
+    """Check that each width is positive and a multiple of the previous one.
+
+    :param widths: width of the intervals of each level.
+    :type widths: list of numbers
+    """
+    if min(widths) <= 0:
+        raise ValueError(f"Error, invalid widths of the intervals {widths}")
+    for prev, width in zip(widths[:-1], widths[1:]):
+        ratio = width / prev
+        if ratio < 1 or not np.isclose(ratio, round(ratio)):
+            raise ValueError(
+                f"Error, the widths of the intervals {widths} are not nested"
+            )
+
+
+def _width_bounds(
+    low: typing.Union[int, float],
+    width: typing.Union[int, float],
+    high: typing.Union[int, float],
+) -> np.ndarray:
+    """Get the bounds of the intervals of a given width covering some values.
+
+    :param low: lower bound of the first interval.
+    :type low: int or float
+
+    :param width: width of the intervals.
+    :type width: int or float
+
+    :param high: highest value to be covered.
+    :type high: int or float
+
+    :return: bounds of the intervals, the last one above the highest value.
+    :rtype: numpy array
+    """
+    n_intervals = int(np.floor((high - low) / width)) + 1
+    return low + width * np.arange(n_intervals + 1)
+
+
+def _quantile_bounds(
+    low: typing.Union[int, float],
+    uniques: np.ndarray,
+    counts: np.ndarray,
+    n_bins: typing.List[int],
+) -> typing.List[np.ndarray]:
+    """Get the bounds of intervals with about the same number of records.
+
+    :param low: lower bound of the first interval.
+    :type low: int or float
+
+    :param uniques: different values, sorted.
+    :type uniques: numpy array
+
+    :param counts: number of records with each value.
+    :type counts: numpy array
+
+    :param n_bins: number of intervals of each level, in decreasing order.
+    :type n_bins: list of int
+
+    :return: bounds of the intervals of each level, the last one being the
+        highest value.
+    :rtype: list of numpy arrays
+    """
+    cumsum = np.cumsum(counts)
+    bounds = []
+    for n in n_bins:
+        # Value from which each quantile starts
+        targets = cumsum[-1] * np.arange(1, n) / n
+        inner = np.unique(uniques[np.searchsorted(cumsum, targets, side="right")])
+        if len(bounds) > 0:
+            # Snapped to the bounds of the previous level, so they are nested
+            prev = bounds[-1][1:-1]
+            if len(prev) == 0:
+                inner = prev
+            else:
+                pos = np.clip(np.searchsorted(prev, inner), 0, len(prev) - 1)
+                inner = np.unique(prev[pos])
+        inner = inner[(inner > low) & (inner < uniques[-1])]
+        bounds.append(np.concatenate([[low], inner, [uniques[-1]]]))
+    return bounds
+
+
+def _interval_labels(
+    uniques: np.ndarray, bounds: np.ndarray, closed: bool = False
+) -> np.ndarray:
+    """Get the label of the interval of each value.
+
+    :param uniques: different values, sorted.
+    :type uniques: numpy array
+
+    :param bounds: bounds of the intervals.
+    :type bounds: numpy array
+
+    :param closed: whether the last interval includes its upper bound.
+    :type closed: bool
+
+    :return: label of the interval of each value.
+    :rtype: numpy array
+    """
+    # A value on a bound is in the interval below it, as in generate_intervals
+    interval = np.searchsorted(bounds, uniques) - 1
+    interval = np.clip(interval, 0, len(bounds) - 2)
+    present, codes = np.unique(interval, return_inverse=True)
+    labels = [f"[{bounds[i]}, {bounds[i + 1]})" for i in present]
+    if closed and present[-1] == len(bounds) - 2:
+        labels[-1] = labels[-1][:-1] + "]"
+    return np.array(labels, dtype=object)[codes.ravel()]
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Module with the privacy metrics of each equivalence class."""
+
+import numpy as np
+from beartype import typing
+from anjana.anonymity.utils.encoding import EncodedTable
+
+
+def emd_ordered(
+    sens_hist: np.ndarray, counts: np.ndarray, distribution: np.ndarray
+) -> np.ndarray:
+    """Get the EMD to the distribution of the SA using the ordered distance.
+
+    Used for numerical sensitive attributes, whose values are sorted.
+
+    :param sens_hist: number of records of each equivalence class (rows) with
+        each value of the sensitive attribute (columns).
+    :type sens_hist: numpy array
+
+    :param counts: size of each equivalence class.
+    :type counts: numpy array
+
+    :param distribution: distribution of the sensitive attribute in the data.
+    :type distribution: numpy array
+
+    :return: EMD of each equivalence class.
+    :rtype: numpy array
+    """
+    r = sens_hist / counts[:, None] - distribution
+    emd = np.cumsum(np.abs(np.cumsum(r, axis=1)), axis=1)[:, -1]
+    return 1 / (len(distribution) - 1) * emd
+
+
+def emd_equal(
+    sens_hist: np.ndarray, counts: np.ndarray, distribution: np.ndarray
+) -> np.ndarray:
+    """Get the EMD to the distribution of the SA using the equal distance.
+
+    Used for categorical sensitive attributes.
+
+    :param sens_hist: number of records of each equivalence class (rows) with
+        each value of the sensitive attribute (columns).
+    :type sens_hist: numpy array
+
+    :param counts: size of each equivalence class.
+    :type counts: numpy array
+
+    :param distribution: distribution of the sensitive attribute in the data.
+    :type distribution: numpy array
+
+    :return: EMD of each equivalence class.
+    :rtype: numpy array
+    """
+    r = sens_hist / counts[:, None] - distribution
+    return 0.5 * np.cumsum(np.abs(r), axis=1)[:, -1]
+
+
+def relative_distance(
+    sens_hist: np.ndarray, counts: np.ndarray, distribution: np.ndarray
+) -> np.ndarray:
+    """Get the maximum relative distance to the distribution of the SA.
+
+    Used for basic and enhanced beta-likeness.
+
+    :param sens_hist: number of records of each equivalence class (rows) with
+        each value of the sensitive attribute (columns).
+    :type sens_hist: numpy array
+
+    :param counts: size of each equivalence class.
+    :type counts: numpy array
+
+    :param distribution: distribution of the sensitive attribute in the data.
+    :type distribution: numpy array
+
+    :return: maximum relative distance of each equivalence class.
+    :rtype: numpy array
+    """
+    q = sens_hist / counts[:, None]
+    return ((q - distribution) / distribution).max(axis=1)
+
+
+def log_ratio(
+    sens_hist: np.ndarray, counts: np.ndarray, distribution: np.ndarray
+) -> np.ndarray:
+    """Get the maximum absolute log-ratio to the distribution of the SA.
+
+    Used for delta-disclosure privacy, only the values of the sensitive
+    attribute present in each equivalence class being considered.
+
+    :param sens_hist: number of records of each equivalence class (rows) with
+        each value of the sensitive attribute (columns).
+    :type sens_hist: numpy array
+
+    :param counts: size of each equivalence class.
+    :type counts: numpy array
+
+    :param distribution: distribution of the sensitive attribute in the data.
+    :type distribution: numpy array
+
+    :return: maximum absolute log-ratio of each equivalence class.
+    :rtype: numpy array
+    """
+    ratio = sens_hist / counts[:, None] / distribution
+    # Absent values (ratio 0) get a log-ratio of 0, not above the maximum
+    return np.abs(np.log(np.where(ratio > 0, ratio, 1))).max(axis=1)
+
+
+def entropy(
+    sens_hist: np.ndarray, counts: np.ndarray, distribution: np.ndarray
+) -> np.ndarray:
+    """Get the entropy of the sensitive attribute in each equivalence class.
+
+    Used for entropy l-diversity, the distribution of the SA in the data not
+    being needed.
+
+    :param sens_hist: number of records of each equivalence class (rows) with
+        each value of the sensitive attribute (columns).
+    :type sens_hist: numpy array
+
+    :param counts: size of each equivalence class.
+    :type counts: numpy array
+
+    :param distribution: distribution of the sensitive attribute in the data.
+    :type distribution: numpy array
+
+    :return: entropy of each equivalence class.
+    :rtype: numpy array
+    """
+    q = sens_hist / counts[:, None]
+    # Absent values do not contribute to the entropy
+    return -(q * np.log(np.where(q > 0, q, 1))).sum(axis=1)
+
+
+def beta_likeness(dist_ec: "ClassMetric") -> typing.Tuple[float, float]:
+    """Get beta for basic and enhanced beta-likeness.
+
+    :param dist_ec: maximum relative distance of each equivalence class.
+    :type dist_ec: ClassMetric
+
+    :return: beta for basic beta-likeness and for enhanced beta-likeness.
+    :rtype: tuple of floats
+    """
+    basic = max(dist_ec.update())
+    enhanced = max(np.minimum(basic, -np.log(dist_ec.distribution)))
+    return basic, enhanced
+
+
+class ClassMetric:
+    """Value of a privacy metric for each equivalence class of a table.
+
+    The distribution of the sensitive attribute in the data is obtained once.
+    When the table is generalized, the metric is only computed again for the
+    equivalence classes resulting from merging others, the rest keeping their
+    value.
+
+    :param table: integer-coded data, with the sensitive attribute.
+    :type table: EncodedTable
+
+    :param metric: function computing the metric from the histograms of the
+        sensitive attribute of some classes, their sizes and the distribution
+        of the sensitive attribute in the data.
+    :type metric: function
+    """
+
+    def __init__(self, table: EncodedTable, metric: typing.Callable):
+        self.table = table
+        self.metric = metric
+        self.distribution = None
+        self.values = None
+        self._classes = None
+        self._sens_values = None
+        self._present = None
+
+    def update(self) -> np.ndarray:
+        """Get the value of the metric for the current equivalence classes.
+
+        :return: value of the metric of each equivalence class.
+        :rtype: numpy array
+        """
+        classes = self.table.equiv_classes()
+        sens_hist = self.table.sens_hist()
+        if self.table.sens_values is not self._sens_values:
+            # The sensitive attribute has been encoded again
+            self._sens_values = self.table.sens_values
+            hist = sens_hist.sum(axis=0)
+            # The values absent from the table (after suppressing records)
+            # are left out, as if the SA did not take them
+            self._present = None if hist.all() else hist > 0
+            if self._present is not None:
+                hist = hist[self._present]
+            self.distribution = hist / hist.sum()
+            self._classes = None
+        if self._present is not None:
+            sens_hist = sens_hist[:, self._present]
+
+        if classes is self._classes:
+            return self.values
+
+        step = None if self._classes is None else classes.merged_from(self._classes)
+        if step is None:
+            values = self.metric(sens_hist, classes.counts, self.distribution)
+        else:
+            merged = np.bincount(step, minlength=len(classes)) > 1
+            values = np.empty(len(classes))
+            values[step] = self.values
+            values[merged] = self.metric(
+                sens_hist[merged], classes.counts[merged], self.distribution
+            )
+
+        self._classes = classes
+        self.values = values
+        return values
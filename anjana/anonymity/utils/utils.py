@@ -20,15 +20,24 @@ import numpy as np
 import pandas as pd
 from beartype import beartype
 from beartype import typing
-from copy import copy
+from anjana.anonymity.utils.hierarchy import (
+    Hierarchy,
+    compile_hierarchies,
+    compile_hierarchy,
+)
 
 
 @beartype()
 def suppress_identifiers(
-    data: pd.DataFrame, ident: typing.Union[typing.List, np.ndarray]
+    data: pd.DataFrame,
+    ident: typing.Union[typing.List, np.ndarray],
+    inplace: bool = True,
 ) -> pd.DataFrame:
     """Remove the identifiers from a dataset.
 
+    Each identifier is replaced by a categorical column whose only category
+    is "*", so a single byte is stored for each record.
+
     :param data: data under study.
     :type data: pandas dataframe
 
@@ -36,64 +45,70 @@ def suppress_identifiers(
         that are identifiers.
     :type ident: list of strings
 
+    :param inplace: whether to replace the columns of the data given or of a
+        shallow copy of it.
+    :type inplace: bool
+
     :return: data with the identifiers suppressed.
     :rtype: pandas dataframe
     """
     for i in ident:
         if i not in data.columns:
             raise ValueError(f"Identifier {i} is not a column in the given dataset")
-        data[i] = ["*"] * len(data)
+
+    if not inplace:
+        data = data.copy(deep=False)
+    for i in ident:
+        data[i] = pd.Categorical.from_codes(
+            np.zeros(len(data), dtype=np.int8), categories=["*"]
+        )
 
     return data
 
 
 @beartype()
 def apply_hierarchy(
-    data: typing.Union[typing.List, np.ndarray], hierarchies: dict, level: int
-) -> typing.Union[typing.List, np.ndarray]:
+    data: typing.Union[typing.List, np.ndarray, pd.Categorical],
+    hierarchies: typing.Union[dict, Hierarchy],
+    level: int,
+) -> typing.Union[typing.List, np.ndarray, pd.Categorical]:
     """Apply the given level of a hierarchy for a quasi-identifier.
 
     :param data: data under study.
-    :type data: list, numpy array
+    :type data: list, numpy array, pandas categorical
 
     :param hierarchies: hierarchies for generalizing a given QI.
-    :type hierarchies: dictionary with the hierarchies and the levels
+    :type hierarchies: dictionary with the hierarchies and the levels, or
+        compiled Hierarchy
 
     :param level: level of the hierarchy to be applied.
     :type level: int
 
-    :return: column with the given level of hierarchy applied.
-    :rtype: numpy array
+    :return: column with the given level of hierarchy applied, categorical
+        if the data given is.
+    :rtype: numpy array, pandas categorical
     """
-    num_level = len(hierarchies.keys()) - 1
-    if level > num_level:
-        raise ValueError("Error, invalid hierarchy level")
-    if not isinstance(hierarchies[level], pd.Series):
-        hierarchies[level] = pd.Series(hierarchies[level])
-    if not isinstance(hierarchies[level - 1], pd.Series):
-        hierarchies[level - 1] = pd.Series(hierarchies[level - 1])
-
-    pos = []
-    for elem in data:
-        pos.append(np.where(hierarchies[level - 1].values == elem)[0][0])
-    data_anon = hierarchies[level].values[pos]
-    return data_anon
+    return apply_hierarchy_current(data, hierarchies, level, level - 1)
 
 
 @beartype()
 def apply_hierarchy_current(
-    data: typing.Union[typing.List, np.ndarray],
-    hierarchies: dict,
+    data: typing.Union[typing.List, np.ndarray, pd.Categorical],
+    hierarchies: typing.Union[dict, Hierarchy],
     level: int,
     actual: int,
-) -> typing.Union[typing.List, np.ndarray]:
+) -> typing.Union[typing.List, np.ndarray, pd.Categorical]:
     """Apply certain level of a hierarchy for a quasi-identifier given the current one.
 
+    A hierarchy given as a dictionary is compiled the first time and reused
+    in the following calls with the same dictionary.
+
     :param data: data under study.
-    :type data: list, numpy array
+    :type data: list, numpy array, pandas categorical
 
     :param hierarchies: hierarchies for generalizing a given QI.
-    :type hierarchies: dictionary with the hierarchies and the levels
+    :type hierarchies: dictionary with the hierarchies and the levels, or
+        compiled Hierarchy
 
     :param level: level of the hierarchy to be applied.
     :type level: int
@@ -101,21 +116,14 @@ def apply_hierarchy_current(
     :param actual: current level of the hierarchy applied.
     :type actual: int
 
-    :return: column with the given level of hierarchy applied.
-    :rtype: numpy array
+    :return: column with the given level of hierarchy applied, categorical
+        if the data given is.
+    :rtype: numpy array, pandas categorical
     """
     num_level = len(hierarchies.keys()) - 1
     if level > num_level:
         raise ValueError("Error, invalid hierarchy level")
-    if not isinstance(hierarchies[level], pd.Series):
-        hierarchies[level] = pd.Series(hierarchies[level])
-    if not isinstance(hierarchies[actual], pd.Series):
-        hierarchies[actual] = pd.Series(hierarchies[actual])
-
-    pos = []
-    for elem in data:
-        pos.append(np.where(hierarchies[actual].values == elem)[0][0])
-    data_anon = hierarchies[level].values[pos]
+    data_anon = compile_hierarchy(hierarchies).generalize(data, level, actual)
     return data_anon
 
 
@@ -127,6 +135,10 @@ def check_gen_level(
 ) -> dict:
     """Check the generalization level for each quasi-identifier.
 
+    The level of each QI is the lowest one of its hierarchy containing all
+    the different values of the column, which are looked up in the index of
+    the levels where each value of the hierarchy appears.
+
     :param data: data under study.
     :type data: pandas dataframe
 
@@ -144,11 +156,9 @@ def check_gen_level(
     gen_level = {}
     for qi in quasi_ident:
         if qi in hierarchies.keys():
-            for level in hierarchies[qi].keys():
-                hierarchy_level = set(hierarchies[qi][level])
-                if set(data[qi].values).issubset(hierarchy_level):
-                    gen_level[qi] = level
-                    break
+            level = compile_hierarchy(hierarchies[qi]).level_of(data[qi].values)
+            if level is not None:
+                gen_level[qi] = level
 
     return gen_level
 
@@ -198,6 +208,7 @@ def apply_transformation(
     quasi_ident: typing.Union[typing.List, np.ndarray],
     hierarchies: dict,
     transformation: list,
+    gen_level: typing.Optional[dict] = None,
 ) -> pd.DataFrame:
     """Apply a given transformation to the data.
 
@@ -215,11 +226,20 @@ def apply_transformation(
     :param transformation: transformation to be applied
     :type transformation: list
 
+    :param gen_level: level of generalization applied to each QI, as
+        returned by ``check_gen_level``. If not given, it is obtained from
+        the data.
+    :type gen_level: dict
+
     :return: dataset generalized with the transformation given
     :rtype: pandas dataframe
     """
-    data_anon = copy(data)
-    actual_transform = check_gen_level(data_anon, quasi_ident, hierarchies)
+    data_anon = data.copy(deep=False)
+    hierarchies = compile_hierarchies(hierarchies)
+    if gen_level is None:
+        actual_transform = check_gen_level(data_anon, quasi_ident, hierarchies)
+    else:
+        actual_transform = gen_level
     for i, qi in enumerate(quasi_ident):
         hierarchy_qi = hierarchies[qi]
         level = transformation[i]
@@ -243,7 +263,8 @@ def generate_intervals(
     inf: typing.Union[int, float],
     sup: typing.Union[int, float],
     step: int,
-) -> list:
+    categorical: bool = False,
+) -> typing.Union[list, pd.Categorical]:
     """
     Generate intervals as hierarchies.
 
@@ -264,15 +285,19 @@ def generate_intervals(
     :param step: spacing between values of the intervals
     :type step: int
 
+    :param categorical: whether to return a categorical with the intervals as
+        categories instead of a list
+    :type categorical: bool
+
     :return: list with the intervals associated with the given values
-    :rtype: list
+    :rtype: list or pandas categorical
     """
     values = np.arange(inf, sup + 1, step)
-    interval = []
-    for num in quasi_ident:
-        lower = np.searchsorted(values, num)
-        if lower == 0:
-            lower = 1
-        interval.append(f"[{values[lower - 1]}, {values[lower]})")
-
-    return interval
+    upper = np.searchsorted(values, quasi_ident)
+    upper[upper == 0] = 1
+    # Only the label of each interval present is built
+    bounds, codes = np.unique(upper, return_inverse=True)
+    labels = [f"[{values[i - 1]}, {values[i]})" for i in bounds]
+    if categorical:
+        return pd.Categorical.from_codes(codes.ravel(), categories=labels)
+    return np.array(labels, dtype=object)[codes.ravel()].tolist()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2024 Spanish National Research Council (CSIC)
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import pandas as pd
+from anjana.anonymity import anonymize, KAnonymity, LDiversity, TCloseness
+from anjana.anonymity.utils import HierarchySet
+import pycanon.anonymity
+import time
+
+data = pd.read_csv("data/adult.csv")  # 32561 rows
+data.columns = data.columns.str.strip()
+cols = [
+    "workclass",
+    "education",
+    "marital-status",
+    "occupation",
+    "sex",
+    "native-country",
+]
+for col in cols:
+    data[col] = data[col].str.strip()
+print(data)  # 32561 rows
+quasi_ident = [
+    "age",
+    "education",
+    "marital-status",
+    "occupation",
+    "sex",
+    "native-country",
+]
+ident = ["race"]
+sens_att = "salary-class"
+k = 10
+l_div = 2
+t = 0.5
+supp_level = 50
+
+# Loaded and validated once, they can be stored with hierarchies.save()
+hierarchies = HierarchySet.from_csv(
+    {
+        "age": "hierarchies/age.csv",
+        "education": "hierarchies/education.csv",
+        "marital-status": "hierarchies/marital.csv",
+        "occupation": "hierarchies/occupation.csv",
+        "sex": "hierarchies/sex.csv",
+        "native-country": "hierarchies/country.csv",
+    }
+)
+
+start = time.time()
+# The three models are verified at once, searching the transformation once
+models = [KAnonymity(k), LDiversity(l_div), TCloseness(t)]
+data_anon = anonymize(
+    data, ident, quasi_ident, sens_att, models, supp_level, hierarchies
+)
+end = time.time()
+print(f"Elapsed time: {end-start}")
+print(
+    f"Value of k calculated: "
+    f"\t{pycanon.anonymity.k_anonymity(data_anon, quasi_ident)}"
+)
+print(
+    f"Value of l-diversity: "
+    f"\t{pycanon.anonymity.l_diversity(data_anon, quasi_ident, [sens_att])}"
+)
+print(
+    f"Value of t-closeness: "
+    f"\t{pycanon.anonymity.t_closeness(data_anon, quasi_ident, [sens_att])}"
+)
+
+# Elapsed time: 0.10476994514465332
+# Value of k calculated: 	10
+# Value of l-diversity: 	2
+# Value of t-closeness: 	0.4749807471748074
@@ -16,7 +16,7 @@
 
 import pandas as pd
 from anjana.anonymity import enhanced_beta_likeness
-import pycanon
+import pycanon.anonymity
 import time
 
 data = pd.read_csv("data/adult.csv")  # 32561 rows
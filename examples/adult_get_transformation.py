@@ -17,7 +17,7 @@
 import pandas as pd
 from anjana.anonymity import utils
 from anjana.anonymity import k_anonymity, l_diversity, t_closeness
-import pycanon
+import pycanon.anonymity
 import time
 
 data = pd.read_csv("data/adult.csv")  # 32561 rows
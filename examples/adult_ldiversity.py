@@ -16,7 +16,7 @@
 
 import pandas as pd
 from anjana.anonymity import l_diversity, entropy_l_diversity, recursive_c_l_diversity
-import pycanon
+import pycanon.anonymity
 import time
 
 data = pd.read_csv("data/adult.csv")  # 32561 rows
@@ -95,7 +95,7 @@ if len(data_anon) > 1:
         f"{pycanon.anonymity.entropy_l_diversity(data_anon, quasi_ident, [sens_att])}"
     )
 
-# Entropy l-diversity cannot be achieved for l=2
+# The anonymization cannot be carried out for entropy l-diversity with l_div=2
 # Elapsed time: 6.262372255325317
 # Value of k calculated: 18327
 # Value of l calculated: 1
@@ -116,7 +116,7 @@ if len(data_anon) > 1:
     )
     print(f"Values of c and l calculated: " f"c={c_cal}, l={l_cal}")
 
-# Recursive (c,l)-diversity cannot be achieved for l=2 and c=2
+# The anonymization cannot be carried out for recursive (c,l)-diversity with c=2, l_div=2
 # Elapsed time: 5.675975561141968
 # Value of k calculated: 18327
 # Values of c and l calculated: (1, 2)
@@ -1,7 +1,18 @@
+import itertools
 import pandas as pd
 from anjana import anonymity
 from anjana.anonymity import utils
-import pycanon
+from anjana.anonymity.utils import encoding, parallel
+from anjana.anonymity.utils.encoding import EncodedTable
+from anjana.anonymity._models import _greedy_search
+from anjana.anonymity.utils.metrics import (
+    ClassMetric,
+    beta_likeness,
+    emd_equal,
+    log_ratio,
+    relative_distance,
+)
+import pycanon.anonymity
 from copy import copy
 import numpy as np
 
@@ -59,7 +70,7 @@ class TestAdult:
     def test_supp_ident(self):
         data_anon = anonymity.utils.suppress_identifiers(self.data, self.ident)
         data_anon_real = copy(self.data)
-        data_anon_real["race"] = "*"
+        data_anon_real["race"] = pd.Categorical(["*"] * len(data_anon_real))
         assert data_anon_real.equals(data_anon)
 
     def test_k_anon(self):
@@ -114,6 +125,313 @@ class TestAdult:
             data_anon, self.quasi_ident, [self.sens_att]
         )
 
+    def test_optimal_k_anon(self):
+        data_anon = anonymity.optimal_k_anonymity(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.k,
+            5,
+            self.hierarchies,
+        )
+        assert self.k <= pycanon.anonymity.k_anonymity(data_anon, self.quasi_ident)
+        assert len(data_anon) >= 0.95 * len(self.data)
+
+    def test_lattice_search_brute_force(self):
+        quasi_ident = self.quasi_ident[:3]
+        hierarchies = {qi: self.hierarchies[qi] for qi in quasi_ident}
+        highest = [len(hierarchies[qi]) - 1 for qi in quasi_ident]
+        n = len(self.data)
+        for k, supp_level in [(10, 50), (200, 30)]:
+            best = {}
+            for node in itertools.product(*[range(h + 1) for h in highest]):
+                data_gen = utils.apply_transformation(
+                    self.data, quasi_ident, hierarchies, list(node)
+                )
+                sizes = data_gen.groupby(quasi_ident).size().values
+                records_sup = sum(sizes[sizes < k])
+                if max(sizes) < k or records_sup * 100 / n > supp_level:
+                    continue
+                prec = np.mean([lev / h for lev, h in zip(node, highest)])
+                dm = sum(sizes[sizes >= k].astype(float) ** 2) + records_sup * n
+                for loss, value in [
+                    ("precision", ((n - records_sup) * prec + records_sup) / n),
+                    ("discernibility", dm),
+                ]:
+                    key = (value, sum(node), node)
+                    best[loss] = min(best.get(loss, key), key)
+            for loss, (_, _, node) in best.items():
+                transformation = anonymity.lattice_search(
+                    self.data, quasi_ident, k, supp_level, hierarchies, loss=loss
+                )
+                assert transformation == list(node)
+
+    def test_lattice_search_parallel_batches(self, monkeypatch):
+        # Adult has fewer classes than needed for using the workers
+        monkeypatch.setattr(parallel, "_MIN_PARALLEL_CLASSES", 0)
+        for loss in ["precision", "discernibility"]:
+            serial = anonymity.lattice_search(
+                self.data, self.quasi_ident, self.k, 50, self.hierarchies, loss=loss
+            )
+            transformation = anonymity.lattice_search(
+                self.data,
+                self.quasi_ident,
+                self.k,
+                50,
+                self.hierarchies,
+                loss=loss,
+                n_jobs=2,
+            )
+            assert transformation == serial
+
+    def test_transformation_evaluator_pool(self, monkeypatch):
+        monkeypatch.setattr(parallel, "_MIN_PARALLEL_CLASSES", 0)
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(self.data, self.quasi_ident, hierarchies)
+        parents = [
+            [np.arange(len(table.labels(qi)))]
+            + [
+                hierarchies[qi].parent_map(table.gen_level[qi], level)
+                for level in range(
+                    table.gen_level[qi] + 1, hierarchies[qi].max_level + 1
+                )
+            ]
+            for qi in self.quasi_ident
+        ]
+        nodes = list(itertools.product(*[range(len(p)) for p in parents]))[::7]
+        with parallel.TransformationEvaluator(
+            table.equiv_classes(), parents, n_jobs=2
+        ) as evaluator:
+            assert evaluator._pool is not None
+            sizes = evaluator.class_sizes(nodes)
+        for node, node_sizes in zip(nodes, sizes):
+            classes = table.roll_up(
+                {
+                    qi: table.gen_level[qi] + offset
+                    for qi, offset in zip(self.quasi_ident, node)
+                }
+            )
+            assert sorted(node_sizes) == sorted(classes.counts)
+
+    def test_categorical_qi(self):
+        data = copy(self.data)
+        for qi in self.quasi_ident + [self.sens_att]:
+            data[qi] = data[qi].astype("category")
+        data_anon = anonymity.t_closeness(
+            data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            self.t,
+            self.supp_level,
+            self.hierarchies,
+        )
+        data_anon_real = anonymity.t_closeness(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            self.t,
+            self.supp_level,
+            self.hierarchies,
+        )
+        assert isinstance(data_anon["age"].dtype, pd.CategoricalDtype)
+        assert data_anon.astype(str).equals(data_anon_real.astype(str))
+
+    def test_apply_transformation_categorical(self):
+        data = copy(self.data)
+        data["education"] = data["education"].astype("category")
+        transformation = [1, 2, 0, 1, 0, 1]
+        data_anon = utils.apply_transformation(
+            data, self.quasi_ident, self.hierarchies, transformation
+        )
+        data_anon_real = utils.apply_transformation(
+            self.data, self.quasi_ident, self.hierarchies, transformation
+        )
+        assert isinstance(data_anon["education"].dtype, pd.CategoricalDtype)
+        assert data_anon["education"].astype(object).equals(data_anon_real["education"])
+        assert transformation == utils.get_transformation(
+            data_anon, self.quasi_ident, self.hierarchies
+        )
+
+    def test_hierarchy_set(self, tmp_path):
+        files = {
+            "age": "age.csv",
+            "education": "education.csv",
+            "marital-status": "marital.csv",
+            "occupation": "occupation.csv",
+            "sex": "sex.csv",
+            "native-country": "country.csv",
+        }
+        hierarchies = utils.HierarchySet.from_csv(
+            {qi: f"./examples/hierarchies/{name}" for qi, name in files.items()}
+        )
+        hierarchies.save(tmp_path)
+        loaded = utils.HierarchySet.load(tmp_path, mmap_mode="r")
+        assert list(loaded) == self.quasi_ident
+        for qi in self.quasi_ident:
+            assert loaded[qi].fingerprint == hierarchies[qi].fingerprint
+        data_anon = anonymity.k_anonymity(
+            self.data, self.ident, self.quasi_ident, self.k, self.supp_level, loaded
+        )
+        data_anon_real = anonymity.k_anonymity(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.k,
+            self.supp_level,
+            self.hierarchies,
+        )
+        assert data_anon.equals(data_anon_real)
+
+    def test_encoded_data(self, tmp_path):
+        encoded = utils.EncodedData.encode(
+            self.data, self.quasi_ident, self.hierarchies, self.sens_att
+        )
+        encoded.save(tmp_path)
+        loaded = utils.EncodedData.load(tmp_path)
+        assert len(loaded) == len(self.data)
+        assert isinstance(loaded.columns["age"][0], np.memmap)
+        data_anon = anonymity.l_diversity(
+            loaded,
+            [],
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            self.l_div,
+            self.supp_level,
+            loaded.hierarchies,
+        )
+        data_anon_real = anonymity.l_diversity(
+            self.data[self.quasi_ident + [self.sens_att]],
+            [],
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            self.l_div,
+            self.supp_level,
+            self.hierarchies,
+        )
+        assert data_anon.astype(str).equals(data_anon_real.astype(str))
+
+    def test_encoded_data_shared(self, tmp_path):
+        utils.EncodedData.encode(
+            self.data, self.quasi_ident, self.hierarchies, self.sens_att
+        ).save(tmp_path)
+        loaded = utils.EncodedData.load(tmp_path)
+        table = EncodedTable(
+            loaded, self.quasi_ident, loaded.hierarchies, self.sens_att
+        )
+        for qi in self.quasi_ident:
+            assert np.shares_memory(table.codes(qi), loaded.columns[qi][0])
+        assert np.shares_memory(table.sens_codes, loaded.columns[self.sens_att][0])
+        table_real = EncodedTable(
+            self.data,
+            self.quasi_ident,
+            utils.compile_hierarchies(self.hierarchies),
+            self.sens_att,
+        )
+        assert table._cache_key()[0] == loaded.fingerprint
+        assert table.gen_level == table_real.gen_level
+        assert np.array_equal(table.sens_codes, table_real.sens_codes)
+
+    def test_encoded_data_hierarchies(self):
+        # Encoded without hierarchies: the values of the codes are looked up
+        encoded = utils.EncodedData.encode(
+            self.data, self.quasi_ident, {}, self.sens_att
+        )
+        data_anon = anonymity.k_anonymity(
+            encoded, [], self.quasi_ident, self.k, self.supp_level, self.hierarchies
+        )
+        data_anon_real = anonymity.k_anonymity(
+            self.data[self.quasi_ident + [self.sens_att]],
+            [],
+            self.quasi_ident,
+            self.k,
+            self.supp_level,
+            self.hierarchies,
+        )
+        assert data_anon.astype(str).equals(data_anon_real.astype(str))
+
+    def test_anonymize_k_l_t(self):
+        models = [
+            anonymity.KAnonymity(self.k),
+            anonymity.LDiversity(self.l_div),
+            anonymity.TCloseness(self.t),
+        ]
+        data_anon = anonymity.anonymize(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            models,
+            self.supp_level,
+            self.hierarchies,
+        )
+        assert self.k <= pycanon.anonymity.k_anonymity(data_anon, self.quasi_ident)
+        assert self.l_div <= pycanon.anonymity.l_diversity(
+            data_anon, self.quasi_ident, [self.sens_att]
+        )
+        assert self.t >= pycanon.anonymity.t_closeness(
+            data_anon, self.quasi_ident, [self.sens_att]
+        )
+
+    def test_anonymize_supp_distribution(self):
+        # Checked with the distribution of the records kept
+        for sens_att in [self.sens_att, "workclass"]:
+            for model, value, check in [
+                (anonymity.TCloseness, 0.2, pycanon.anonymity.t_closeness),
+                (
+                    anonymity.BasicBetaLikeness,
+                    0.5,
+                    pycanon.anonymity.basic_beta_likeness,
+                ),
+                (
+                    anonymity.EnhancedBetaLikeness,
+                    0.5,
+                    pycanon.anonymity.enhanced_beta_likeness,
+                ),
+                (anonymity.DeltaDisclosure, 1.0, pycanon.anonymity.delta_disclosure),
+            ]:
+                models = [anonymity.KAnonymity(self.k), model(value)]
+                data_anon = anonymity.anonymize(
+                    self.data,
+                    self.ident,
+                    self.quasi_ident,
+                    sens_att,
+                    models,
+                    self.supp_level,
+                    self.hierarchies,
+                )
+                assert check(data_anon, self.quasi_ident, [sens_att]) <= value
+
+    def test_l_div_result(self):
+        args = (
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            self.l_div,
+            self.supp_level,
+            self.hierarchies,
+        )
+        result = anonymity.l_diversity(*args, return_result=True)
+        assert isinstance(result, anonymity.AnonymizationResult)
+        assert result.data.equals(anonymity.l_diversity(*args))
+        assert len(result.data) + len(result.suppressed) == len(self.data)
+        assert result.transformation == utils.get_transformation(
+            result.data, self.quasi_ident, self.hierarchies
+        )
+        assert result.achieved["k"] == pycanon.anonymity.k_anonymity(
+            result.data, self.quasi_ident
+        )
+        assert result.achieved["l_div"] == pycanon.anonymity.l_diversity(
+            result.data, self.quasi_ident, [self.sens_att]
+        )
+
     def test_alpha_k_anon(self):
         data_anon = anonymity.alpha_k_anonymity(
             self.data,
@@ -130,6 +448,23 @@ class TestAdult:
         )
         assert self.alpha >= alpha and self.k <= k
 
+    def test_alpha_k_anon_supp_first(self):
+        # The records are suppressed for the transformation verifying
+        # k-anonymity, with no further generalization
+        args = (self.data, self.ident, self.quasi_ident)
+        result_k = anonymity.k_anonymity(
+            *args, self.k, 100, self.hierarchies, return_result=True
+        )
+        result = anonymity.alpha_k_anonymity(
+            *args, self.sens_att, self.k, 0.6, 100, self.hierarchies, return_result=True
+        )
+        assert result.transformation == result_k.transformation
+        assert len(result.suppressed) > len(result_k.suppressed)
+        alpha, _ = pycanon.anonymity.alpha_k_anonymity(
+            result.data, self.quasi_ident, [self.sens_att]
+        )
+        assert alpha <= 0.6
+
     def test_basic_beta(self):
         data_anon = anonymity.basic_beta_likeness(
             self.data,
@@ -160,6 +495,24 @@ class TestAdult:
             data_anon, self.quasi_ident, [self.sens_att]
         )
 
+    def test_enhanced_beta_supp(self):
+        data_anon = anonymity.enhanced_beta_likeness(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            1.0,
+            100,
+            self.hierarchies,
+        )
+        # Same data as when checking the beta of the whole table
+        assert len(data_anon) == 8875
+        beta = pycanon.anonymity.enhanced_beta_likeness(
+            data_anon, self.quasi_ident, [self.sens_att]
+        )
+        assert np.isclose(beta, 0.7700611306916217)
+
     def test_delta_disclosure(self):
         data_anon = anonymity.delta_disclosure(
             self.data,
@@ -403,12 +756,13 @@ class TestHospital:
         )
 
         data_anon_real = copy(self.data)
-        data_anon_real[self.ident] = "*"
+        for col in self.ident:
+            data_anon_real[col] = pd.Categorical(["*"] * len(data_anon_real))
         hierarchy_age = self.hierarchies["age"]
         pos = []
         for elem in data_anon_real["age"].values:
-            pos.append(np.where(hierarchy_age[0].values == elem)[0][0])
-        data_anon_real["age"] = hierarchy_age[2].values[pos]
+            pos.append(np.where(np.asarray(hierarchy_age[0]) == elem)[0][0])
+        data_anon_real["age"] = np.asarray(hierarchy_age[2])[pos]
         assert data_anon_real.equals(data_anon)
 
     def test_k_anon_big(self):
@@ -423,6 +777,21 @@ class TestHospital:
 
         assert data_anon.equals(pd.DataFrame())
 
+    def test_l_div_k_big(self):
+        result = anonymity.l_diversity(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            30,
+            self.l_div,
+            self.supp_level,
+            self.hierarchies,
+            return_result=True,
+        )
+        assert result.data.equals(pd.DataFrame())
+        assert "k" in result.achieved
+
     def test_l_div(self):
         data_anon = anonymity.l_diversity(
             self.data,
@@ -436,12 +805,13 @@ class TestHospital:
         )
 
         data_anon_real = copy(self.data)
-        data_anon_real[self.ident] = "*"
+        for col in self.ident:
+            data_anon_real[col] = pd.Categorical(["*"] * len(data_anon_real))
         hierarchy_age = self.hierarchies["age"]
         pos = []
         for elem in data_anon_real["age"].values:
-            pos.append(np.where(hierarchy_age[0].values == elem)[0][0])
-        data_anon_real["age"] = hierarchy_age[2].values[pos]
+            pos.append(np.where(np.asarray(hierarchy_age[0]) == elem)[0][0])
+        data_anon_real["age"] = np.asarray(hierarchy_age[2])[pos]
         data_anon_real["city"] = "*"
         assert data_anon_real.equals(data_anon)
 
@@ -574,3 +944,380 @@ class TestHospital:
             "[15, 20)",
         ]
         assert real_interval == int5
+
+    def test_numeric_hierarchy(self):
+        hierarchy = utils.numeric_hierarchy(self.data["age"], widths=[5, 10], inf=0)
+        ages = np.unique(self.data["age"].values)
+        assert list(hierarchy[0]) == list(ages)
+        assert list(hierarchy[1]) == utils.generate_intervals(ages, 0, 100, 5)
+        assert list(hierarchy[2]) == utils.generate_intervals(ages, 0, 100, 10)
+        assert set(hierarchy[3]) == {"*"}
+        data_anon = anonymity.k_anonymity(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.k,
+            self.supp_level,
+            dict(self.hierarchies, age=hierarchy),
+        )
+        assert self.k <= pycanon.anonymity.k_anonymity(data_anon, self.quasi_ident)
+
+    def test_numeric_hierarchy_quantile(self):
+        hierarchy = utils.numeric_hierarchy(
+            self.data["age"], method="quantile", n_bins=[4, 2]
+        )
+        for level in range(hierarchy.max_level):
+            parent = hierarchy.parent_map(level, level + 1)
+            assert len(np.unique(parent)) == len(hierarchy.labels(level + 1))
+
+    def test_numeric_hierarchy_bounds(self):
+        values = np.array([0, 3, 5, 10, 15, 20])
+        hierarchy = utils.numeric_hierarchy(values, widths=[5, 10], inf=0)
+        assert list(hierarchy[1]) == utils.generate_intervals(values, 0, 20, 5)
+        assert list(hierarchy[2]) == utils.generate_intervals(values, 0, 20, 10)
+
+    def test_generate_intervals_categorical(self):
+        int10 = utils.generate_intervals(
+            self.data["age"].values, 0, 100, 10, categorical=True
+        )
+        assert list(int10.categories) == ["[10, 20)", "[20, 30)"]
+        assert list(int10) == utils.generate_intervals(
+            self.data["age"].values, 0, 100, 10
+        )
+
+    def test_level_of(self):
+        hierarchy = utils.Hierarchy(self.hierarchies["age"])
+        int10 = utils.generate_intervals(self.data["age"].values, 0, 100, 10)
+        assert hierarchy.level_of(self.data["age"].values) == 0
+        assert hierarchy.level_of(int10) == 2
+        assert hierarchy.level_of(pd.Categorical(int10)) == 2
+        assert hierarchy.level_of(["unknown"]) is None
+        transformation = [2, 1, 1]
+        data_anon = utils.apply_transformation(
+            self.data, self.quasi_ident, self.hierarchies, transformation
+        )
+        gen_level = utils.check_gen_level(data_anon, self.quasi_ident, self.hierarchies)
+        assert list(gen_level.values()) == transformation
+        data_anon2 = utils.apply_transformation(
+            data_anon, self.quasi_ident, self.hierarchies, [2, 1, 1], gen_level
+        )
+        assert data_anon2.equals(data_anon)
+
+    def test_compile_hierarchy_reused(self):
+        hierarchy = dict(self.hierarchies["age"])
+        compiled = utils.compile_hierarchy(hierarchy)
+        assert utils.compile_hierarchy(hierarchy) is compiled
+        assert utils.compile_hierarchies({"age": hierarchy})["age"] is compiled
+        hierarchy[1] = hierarchy[1].copy()
+        assert utils.compile_hierarchy(hierarchy) is not compiled
+
+    def test_apply_hierarchy_compiled(self):
+        hierarchy = utils.Hierarchy(self.hierarchies["age"])
+        data_gen = utils.apply_hierarchy(self.data["age"].values, hierarchy, 1)
+        real_gen = utils.apply_hierarchy(
+            self.data["age"].values, self.hierarchies["age"], 1
+        )
+        assert list(real_gen) == list(data_gen)
+
+    def test_encoded_table(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(copy(self.data), self.quasi_ident, hierarchies)
+        table.generalize("age")
+        table.generalize("age")
+        data_transform = utils.apply_transformation(
+            self.data, self.quasi_ident, self.hierarchies, [2, 0, 0]
+        )
+        assert data_transform.equals(table.decode())
+
+    def test_encoded_table_decode_copy(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        data = copy(self.data)
+        table = EncodedTable(data, self.quasi_ident, hierarchies)
+        table.generalize("age")
+        data_anon = table.decode()
+        assert data.equals(self.data)
+        assert not data_anon["age"].equals(data["age"])
+
+    def test_equiv_classes_merge(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(copy(self.data), self.quasi_ident, hierarchies)
+        table.equiv_classes()
+        table.generalize("age")
+        table.generalize("city")
+        classes = table.equiv_classes()
+        equiv_class = pycanon.anonymity.utils.aux_anonymity.get_equiv_class(
+            table.decode(), self.quasi_ident
+        )
+        assert sorted(classes.counts) == sorted([len(ec) for ec in equiv_class])
+        assert list(np.bincount(classes.row_class())) == list(classes.counts)
+
+    def test_lattice_search(self):
+        transformation = anonymity.lattice_search(
+            self.data, self.quasi_ident, self.k, self.supp_level, self.hierarchies
+        )
+        data_anon = utils.apply_transformation(
+            self.data, self.quasi_ident, self.hierarchies, transformation
+        )
+        assert self.k <= pycanon.anonymity.k_anonymity(data_anon, self.quasi_ident)
+        assert transformation == [2, 0, 0]
+
+    def test_lattice_search_parallel(self):
+        transformation = anonymity.lattice_search(
+            self.data,
+            self.quasi_ident,
+            self.k,
+            self.supp_level,
+            self.hierarchies,
+            n_jobs=2,
+        )
+        assert transformation == [2, 0, 0]
+
+    def test_class_stats_cache(self):
+        utils.class_stats_cache.clear()
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(copy(self.data), self.quasi_ident, hierarchies)
+        table.generalize("age")
+        classes = table.equiv_classes()
+        table_rep = EncodedTable(copy(self.data), self.quasi_ident, hierarchies)
+        table_rep.generalize("age")
+        assert table_rep.equiv_classes() is classes
+        assert utils.class_stats_cache.hits > 0
+
+    def test_class_stats_cache_fingerprint(self, monkeypatch):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(copy(self.data), self.quasi_ident, hierarchies)
+        data = copy(self.data)
+        data.loc[[0, 1], "age"] = data.loc[[1, 0], "age"].values
+        table_mod = EncodedTable(data, self.quasi_ident, hierarchies)
+        assert table._cache_key() != table_mod._cache_key()
+
+        # Computed once, from the codes, when the data is encoded
+        key = table._cache_key()
+        monkeypatch.setattr(encoding, "fingerprint", None)
+        table.generalize("age")
+        assert table._cache_key()[0] == key[0]
+
+    def test_class_stats_cache_eviction(self):
+        cache = utils.ClassStatsCache(max_bytes=2**20)
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(copy(self.data), self.quasi_ident, hierarchies)
+        cache.put(("a",), table.equiv_classes())
+        table.generalize("age")
+        cache.put(("b",), table.equiv_classes())
+        cache.get(("a",))
+        cache.resize(cache.nbytes - 1)
+        assert ("a",) in cache and ("b",) not in cache
+
+    def test_class_stats_cache_nbytes(self):
+        cache = utils.ClassStatsCache()
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(copy(self.data), self.quasi_ident, hierarchies)
+        table.equiv_classes()
+        table.generalize("age")
+        classes = table.equiv_classes()
+        cache.put(("a",), classes)
+        # The class of each record is counted before being built
+        nbytes = cache.nbytes
+        classes.row_class()
+        assert classes.nbytes <= nbytes
+        assert nbytes >= len(self.data) * classes.row_class().itemsize
+        assert not cache.get(("a",)).counts.flags.writeable
+
+    def test_sens_hist_merge(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(
+            copy(self.data), self.quasi_ident, hierarchies, self.sens_att
+        )
+        table.sens_hist()
+        table.generalize("age")
+        table.generalize("city")
+        row_class = table.equiv_classes().row_class()
+        hist = np.array(
+            [
+                np.bincount(table.sens_codes[row_class == c], minlength=len(row))
+                for c, row in enumerate(table.sens_hist())
+            ]
+        )
+        assert (hist == table.sens_hist()).all()
+
+    def test_suppress_classes(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(
+            copy(self.data), self.quasi_ident, hierarchies, self.sens_att
+        )
+        table.sens_hist()
+        table.generalize("age")
+        keep = table.equiv_classes().counts >= 2
+        table_supp = table.suppress(keep)
+        classes = table_supp.equiv_classes()
+        assert list(classes.counts) == list(table.equiv_classes().counts[keep])
+        assert list(np.bincount(classes.row_class())) == list(classes.counts)
+        regrouped = table.take(keep[table.equiv_classes().row_class()])
+        assert (regrouped.sens_hist() == table_supp.sens_hist()).all()
+        data_anon = table_supp.decode()
+        assert "index" not in data_anon.columns
+        assert list(data_anon.index) == list(range(len(table_supp)))
+
+    def test_roll_up(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(
+            copy(self.data), self.quasi_ident, hierarchies, self.sens_att
+        )
+        table.sens_hist()
+        classes = table.roll_up({"age": 2, "gender": 1})
+        data_transform = utils.apply_transformation(
+            self.data, self.quasi_ident, self.hierarchies, [2, 1, 0]
+        )
+        equiv_class = pycanon.anonymity.utils.aux_anonymity.get_equiv_class(
+            data_transform, self.quasi_ident
+        )
+        assert sorted(classes.counts) == sorted([len(ec) for ec in equiv_class])
+        row_class = classes.row_class()
+        for c, row in enumerate(classes.sens_hist):
+            hist = np.bincount(table.sens_codes[row_class == c], minlength=len(row))
+            assert (hist == row).all()
+
+    def test_alpha_k_anon_supp(self):
+        alpha = 0.5
+        data_anon = anonymity.alpha_k_anonymity(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            alpha,
+            50,
+            self.hierarchies,
+        )
+        alpha_real, _ = pycanon.anonymity.alpha_k_anonymity(
+            data_anon, self.quasi_ident, [self.sens_att]
+        )
+        assert alpha_real <= alpha
+
+    def test_l_div_k1(self):
+        data_anon = anonymity.l_diversity(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            1,
+            self.l_div,
+            50,
+            self.hierarchies,
+        )
+        l_real = pycanon.anonymity.l_diversity(
+            data_anon, self.quasi_ident, [self.sens_att]
+        )
+        assert l_real >= self.l_div
+
+    def test_rec_c_l_supp(self):
+        c = 2
+        data_anon = anonymity.recursive_c_l_diversity(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            c,
+            self.l_div,
+            50,
+            self.hierarchies,
+        )
+        c_real, l_real = pycanon.anonymity.recursive_c_l_diversity(
+            data_anon, self.quasi_ident, [self.sens_att]
+        )
+        assert l_real >= self.l_div and c_real >= c
+
+    def test_class_metric_update(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(
+            copy(self.data), self.quasi_ident, hierarchies, self.sens_att
+        )
+        emd_ec = ClassMetric(table, emd_equal)
+        emd_ec.update()
+        table.generalize("age")
+        table.generalize("gender")
+        classes = table.equiv_classes()
+        emd = emd_equal(table.sens_hist(), classes.counts, emd_ec.distribution)
+        assert np.allclose(emd_ec.update(), emd)
+        t_real = pycanon.anonymity.t_closeness(
+            table.frame(), self.quasi_ident, [self.sens_att]
+        )
+        assert max(emd_ec.values) == t_real
+
+    def test_log_ratio_update(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(
+            copy(self.data), self.quasi_ident, hierarchies, self.sens_att
+        )
+        delta_ec = ClassMetric(table, log_ratio)
+        delta_ec.update()
+        table.generalize("age")
+        table.generalize("city")
+        delta_real = pycanon.anonymity.delta_disclosure(
+            table.frame(), self.quasi_ident, [self.sens_att]
+        )
+        assert max(delta_ec.update()) == delta_real
+
+    def test_beta_likeness_evaluator(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(
+            copy(self.data), self.quasi_ident, hierarchies, self.sens_att
+        )
+        dist_ec = ClassMetric(table, relative_distance)
+        beta_likeness(dist_ec)
+        table.generalize("age")
+        basic, enhanced = beta_likeness(dist_ec)
+        data_gen = table.frame()
+        assert basic == pycanon.anonymity.basic_beta_likeness(
+            data_gen, self.quasi_ident, [self.sens_att]
+        )
+        assert enhanced == pycanon.anonymity.enhanced_beta_likeness(
+            data_gen, self.quasi_ident, [self.sens_att]
+        )
+
+    def test_greedy_search_k(self):
+        data_anon = anonymity.k_anonymity(
+            self.data,
+            self.ident,
+            self.quasi_ident,
+            self.k,
+            self.supp_level,
+            self.hierarchies,
+        )
+        data = utils.suppress_identifiers(copy(self.data), self.ident)
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(data, self.quasi_ident, hierarchies)
+        table = _greedy_search(table, [anonymity.KAnonymity(self.k)], self.supp_level)
+        assert table.decode().equals(data_anon)
+
+    def test_greedy_search_models(self):
+        data = utils.suppress_identifiers(copy(self.data), self.ident)
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(data, self.quasi_ident, hierarchies, self.sens_att)
+        models = [
+            anonymity.KAnonymity(self.k),
+            anonymity.LDiversity(self.l_div),
+            anonymity.DeltaDisclosure(2),
+        ]
+        data_anon = _greedy_search(table, models, 20).decode()
+        assert self.k <= pycanon.anonymity.k_anonymity(data_anon, self.quasi_ident)
+        assert self.l_div <= pycanon.anonymity.l_diversity(
+            data_anon, self.quasi_ident, [self.sens_att]
+        )
+        assert all(model._metric is None for model in models[2:])
+
+    def test_input_not_modified(self):
+        data = copy(self.data)
+        data_anon = anonymity.l_diversity(
+            data,
+            self.ident,
+            self.quasi_ident,
+            self.sens_att,
+            self.k,
+            self.l_div,
+            self.supp_level,
+            self.hierarchies,
+        )
+        assert data.equals(self.data)
+        assert not data_anon[self.quasi_ident].equals(data[self.quasi_ident])
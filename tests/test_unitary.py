@@ -2,6 +2,7 @@ import unittest
 import anjana
 from anjana import anonymity
 from anjana.anonymity import utils
+from anjana.anonymity.utils.encoding import EncodedTable
 import pandas as pd
 import beartype
 
@@ -53,6 +54,14 @@ class TestInvalidValues(unittest.TestCase):
         with self.assertRaises(ValueError):
             anjana.anonymity.utils.suppress_identifiers(self.data, ident)
 
+    def test_supp_identifiers_copy(self):
+        data = self.data[["race", "age"]]
+        data_supp = anjana.anonymity.utils.suppress_identifiers(
+            data, ["race"], inplace=False
+        )
+        self.assertEqual(list(data_supp["race"].cat.categories), ["*"])
+        self.assertFalse(data["race"].equals(data_supp["race"]))
+
     def test_k_neg(self):
         k = -1
         supp_level = 50
@@ -569,3 +578,69 @@ class TestInvalidValues(unittest.TestCase):
             utils.apply_transformation(
                 self.data, self.quasi_ident, self.hierarchies, [100, 1, 1]
             )
+
+    def test_apply_hierarchy_out(self):
+        hierarchy = utils.Hierarchy(self.hierarchies["sex"])
+        with self.assertRaises(ValueError):
+            utils.apply_hierarchy(self.data["sex"].values, hierarchy, 2)
+
+    def test_lattice_search_loss(self):
+        with self.assertRaises(ValueError):
+            anonymity.lattice_search(
+                self.data, self.quasi_ident, 10, 50, self.hierarchies, loss="nan"
+            )
+
+    def test_lattice_search_jobs(self):
+        with self.assertRaises(ValueError):
+            anonymity.lattice_search(
+                self.data, self.quasi_ident, 10, 50, self.hierarchies, n_jobs=0
+            )
+
+    def test_class_stats_cache_size(self):
+        with self.assertRaises(ValueError):
+            utils.ClassStatsCache(max_bytes=-1)
+
+    def test_roll_up_finer(self):
+        hierarchies = utils.compile_hierarchies(self.hierarchies)
+        table = EncodedTable(self.data, self.quasi_ident, hierarchies)
+        table.roll_up({"age": 2})
+        with self.assertRaises(ValueError):
+            table.roll_up({"age": -1})
+
+    def test_privacy_models(self):
+        with self.assertRaises(ValueError):
+            anonymity.KAnonymity(0)
+        with self.assertRaises(ValueError):
+            anonymity.AlphaAnonymity(2)
+        with self.assertRaises(ValueError):
+            anonymity.RecursiveCLDiversity(0, 2)
+        with self.assertRaises(ValueError):
+            anonymity.TCloseness(-0.5)
+        with self.assertRaises(ValueError):
+            anonymity.EnhancedBetaLikeness(-1)
+        with self.assertRaises(TypeError):
+            anonymity.PrivacyModel()
+
+    def test_anonymize_sens_att(self):
+        with self.assertRaises(ValueError):
+            anonymity.anonymize(
+                self.data,
+                self.ident,
+                self.quasi_ident,
+                None,
+                [anonymity.KAnonymity(10), anonymity.LDiversity(2)],
+                50,
+                self.hierarchies,
+            )
+
+    def test_numeric_hierarchy_widths(self):
+        with self.assertRaises(ValueError):
+            utils.numeric_hierarchy(self.data["age"], widths=[5, 7])
+        with self.assertRaises(ValueError):
+            utils.numeric_hierarchy(self.data["age"], method="quantile")
+
+    def test_hierarchy_set_invalid(self):
+        with self.assertRaises(ValueError):
+            utils.HierarchySet({"age": {0: [30, 40, 40], 1: ["a", "a", "b"]}})
+        with self.assertRaises(ValueError):
+            utils.HierarchySet({"age": {0: [30, 40], 1: ["*"]}})